@@ -0,0 +1,27 @@
+"""Add achievement lookup indexes
+
+Revision ID: 3c8e1f2a9d47
+Revises: f11f235d2be3
+Create Date: 2026-10-16 19:35:12.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e1f2a9d47'
+down_revision: Union[str, None] = 'f11f235d2be3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_achievement_criteria_achievement_id'), 'achievement_criteria', ['achievement_id'], unique=False)
+    op.create_index('ix_user_achievements_user_id_achievement_id', 'user_achievements', ['user_id', 'achievement_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_achievements_user_id_achievement_id', table_name='user_achievements')
+    op.drop_index(op.f('ix_achievement_criteria_achievement_id'), table_name='achievement_criteria')
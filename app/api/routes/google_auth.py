@@ -1,5 +1,6 @@
 # app/api/routes/google_auth.py
 from fastapi import APIRouter, Depends, HTTPException, Request, Body
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 
 from app.api import deps
@@ -141,8 +142,9 @@ async def complete_google_auth(
         if not state or not code:
             return get_error_page("Missing required parameters")
 
-        # Use the service to complete OAuth flow
-        calendar_service.complete_oauth_flow(state, code)
+        # Use the service to complete OAuth flow. The token exchange is a
+        # blocking HTTPS call, so keep it off the event loop
+        await run_in_threadpool(calendar_service.complete_oauth_flow, state, code)
 
         return get_success_page()
     except Exception as e:
@@ -1,8 +1,9 @@
 from typing import Dict, Optional
+from urllib.parse import quote
 import logging
 
 from fastapi import APIRouter, Depends, UploadFile, File, Form
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 
 from app.api.deps import (
     get_current_user,
@@ -16,16 +17,29 @@ from app.services.note_service import NoteService
 from app.schemas.note import (
     NoteCreate, NoteUpdate, Note, VoiceNoteCreate, NoteList,
     ShareLinkResponse, UnshareResponse, 
-    ExportResponse,
-    FolderListResponse, TagListResponse
+    FolderListResponse, TagListResponse, rebuild_voice_note_models
 )
 from app.core.logging import log_context
+from app.core.routing import InternedJSONRoute
 from app.schemas.subscription import SubscriptionStatus
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=InternedJSONRoute)
+
+
+def _content_disposition(filename: str) -> str:
+    """
+    Attachment header for a filename in any script. Header values must be
+    Latin-1, so the name is sent as an ASCII fallback and, exactly, as an
+    RFC 5987 filename* parameter.
+    """
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace("?", "_")
+    return (
+        f'attachment; filename="{fallback}"; '
+        f"filename*=UTF-8''{quote(filename, safe='')}"
+    )
 
 
 @router.post("/", response_model=Note)
@@ -73,7 +87,7 @@ async def list_notes(
     search: Optional[str] = None,
     sort_by: str = "updated_at",
     sort_order: str = "desc",
-) -> NoteList:
+) -> Response:
     """Get a list of notes with pagination and filtering"""
     with log_context(
         user_id=current_user.id,
@@ -82,9 +96,12 @@ async def list_notes(
         tag=tag,
         search=search,
     ):
-        return await note_service.get_notes(
+        notes = await note_service.get_notes(
             current_user.id, skip, limit, folder, tag, search, sort_by, sort_order
         )
+        # The page is already validated; serialize it in one pass instead of
+        # letting FastAPI re-validate every item against response_model
+        return Response(content=notes.model_dump_json(), media_type="application/json")
 
 
 @router.put("/{note_id}", response_model=Note)
@@ -149,6 +166,8 @@ async def create_voice_note(
     ):
         _subscription_status, audio_duration_minutes = gen_access
         logger.info(f"Audio duration: {audio_duration_minutes:.2f} minutes")
+        # The voice schemas reference UploadFile lazily; resolve it on first use
+        rebuild_voice_note_models()
         # Return the audio duration for the service to use
         note_data = VoiceNoteCreate(
             audio_file=audio_file,
@@ -184,13 +203,13 @@ async def unshare_note(
         return await note_service.unshare_note(current_user.id, note_id)
 
 
-@router.post("/{note_id}/export", response_model=ExportResponse)
+@router.post("/{note_id}/export", response_class=StreamingResponse)
 async def export_note(
     note_id: int,
     format: NoteExportFormat,
     note_service: NoteService = Depends(get_note_service()),
     current_user: User = Depends(get_current_user),
-) -> ExportResponse:
+) -> StreamingResponse:
     """Export a note to a different format - no subscription required"""
     with log_context(
         user_id=current_user.id,
@@ -199,9 +218,17 @@ async def export_note(
         format=format
     ):
         logger.info(f"Exporting note {note_id} to {format}")
-        result = await note_service.export_note(current_user.id, note_id, format)
-        return Response(
-            content=result.content,
-            media_type=result.content_type,
-            headers={"Content-Disposition": f"attachment; filename={result.filename}"},
+        content, content_type, filename = await note_service.export_note(
+            current_user.id, note_id, format
+        )
+        # Stream the raw bytes so the payload never passes through pydantic.
+        # The document is already complete, so send it as one chunk rather
+        # than iterating a buffer, which would split it on every newline
+        return StreamingResponse(
+            iter((content,)),
+            media_type=content_type,
+            headers={
+                "Content-Disposition": _content_disposition(filename),
+                "Content-Length": str(len(content)),
+            },
         )
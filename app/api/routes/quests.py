@@ -18,12 +18,13 @@ from app.core.exceptions import ProcessingException, BusinessException
 from app.core.config import settings
 from app.services.quest_service import QuestService
 from app.core.logging import log_context
+from app.core.routing import InternedJSONRoute
 from app.schemas.subscription import SubscriptionStatus
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=InternedJSONRoute)
 
 
 @router.get("/", response_model=List[schemas.Quest])
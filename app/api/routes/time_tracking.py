@@ -26,13 +26,14 @@ from app.schemas.time_tracking import (
     BatchUpdatePaymentStatusResponse,
 )
 from app.core.logging import log_context
+from app.core.routing import InternedJSONRoute
 from app.core.exceptions import BusinessException, ResourceNotFoundException
 from app.utils.dependencies import get_service
 from app.schemas.subscription import SubscriptionStatus
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=InternedJSONRoute)
 
 
 # Time Entry CRUD endpoints
@@ -46,7 +47,7 @@ async def list_time_entries(
     limit: int = Query(100, ge=1, le=1000),
     current_user: User = Depends(get_current_user),
     time_tracking_service: TimeTrackingService = Depends(get_service(TimeTrackingService)),
-) -> TimeEntryList:
+) -> Response:
     """Get a list of time entries with pagination and filtering"""
     with log_context(
         user_id=current_user.id,
@@ -56,7 +57,7 @@ async def list_time_entries(
         payment_status=payment_status,
     ):
         try:
-            return await time_tracking_service.get_time_entries(
+            entries = await time_tracking_service.get_time_entries(
                 user_id=current_user.id,
                 skip=skip,
                 limit=limit,
@@ -64,6 +65,10 @@ async def list_time_entries(
                 end_date=end_date,
                 payment_status=payment_status,
             )
+            # Already validated by the service; skip FastAPI's second pass
+            return Response(
+                content=entries.model_dump_json(), media_type="application/json"
+            )
         except BusinessException as e:
             logger.warning(f"Business error listing time entries: {str(e)}")
             raise HTTPException(status_code=400, detail=str(e))
@@ -252,7 +257,7 @@ async def generate_invoice_link(
             "filters": {
                 "start_date": data.start_date.isoformat() if data.start_date else None,
                 "end_date": data.end_date.isoformat() if data.end_date else None,
-                "payment_status": data.payment_status.value if data.payment_status else None,
+                "payment_status": data.payment_status,
             }
         }
         
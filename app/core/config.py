@@ -60,7 +60,25 @@ class Settings(BaseSettings):
     # API Call Timeouts (in seconds)
     DEFAULT_TIMEOUT: int = 30
     LLM_TIMEOUT: int = 60
+    # Concurrent LLM requests per process, tuned to the provider's rate limits
+    LLM_MAX_CONCURRENCY: int = 50
+    # Log full LLM responses at debug level; they may contain user data
+    LLM_DEBUG_PAYLOADS: bool = False
+    # Retries of rate-limited, 5xx and connection-failed LLM requests
+    LLM_MAX_RETRIES: int = 3
     STT_TIMEOUT: int = 120
+    # Concurrent Deepgram requests per process, including long recordings'
+    # chunks
+    STT_MAX_CONCURRENCY: int = 10
+    # Retries of rate-limited, 5xx and connection-failed Deepgram requests
+    STT_MAX_RETRIES: int = 3
+    # Voice notes still processing after this long were lost (e.g. to a
+    # worker restart) and are failed with their minutes refunded
+    VOICE_NOTE_PROCESSING_TIMEOUT: int = 3600
+    # How often each worker looks for such notes
+    VOICE_NOTE_RECOVERY_INTERVAL: int = 300
+    # Uploaded audio is kept here until its background processing finishes
+    VOICE_NOTE_AUDIO_DIR: str = "/var/tmp/voice-notes"
 
     # Speech-to-Text settings
     DEFAULT_STT_PROVIDER: str = "deepgram"  # Default provider
@@ -76,10 +94,23 @@ class Settings(BaseSettings):
         "mistralai/mistral-7b-instruct"  # Default model for quest parsing
     )
 
+    # Ordered model pools tried before the default model, e.g. small fast
+    # models first
+    OPENROUTER_PARSING_MODELS: List[str] = []
+    OPENROUTER_TRANSLATION_MODELS: List[str] = []
+
+    # Identical LLM requests within the TTL reuse the stored response
+    LLM_RESPONSE_CACHE_ENABLED: bool = True
+    LLM_RESPONSE_CACHE_TTL: int = 86400
+    LLM_RESPONSE_CACHE_SIZE: int = 1024
+
     # Feature flags
     ENABLE_LLM_FEATURES: bool = True
     ENABLE_VOICE_FEATURES: bool = True
     ENABLE_TRANSLATION: bool = True
+    # Lay out PDF exports with ReportLab's Platypus engine instead of
+    # drawing them straight onto a canvas
+    PDF_EXPORT_USE_PLATYPUS: bool = False
 
     # Google
     GOOGLE_CLIENT_ID: str = ""
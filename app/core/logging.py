@@ -1,6 +1,9 @@
+import atexit
 import logging
+import queue
 import sys
 import os
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, Any, Optional
 import json
 from datetime import datetime
@@ -13,6 +16,20 @@ from app.core.config import settings
 # Global context variable for request information
 request_context = contextvars.ContextVar("request_context", default={})
 
+# Background thread that writes queued records to the real handlers
+_queue_listener: Optional[QueueListener] = None
+
+
+def _stop_queue_listener() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
 
 class JsonFormatter(logging.Formatter):
     """
@@ -50,8 +67,9 @@ class JsonFormatter(logging.Formatter):
             for key, value in record.extras.items():
                 record_dict[key] = value
 
-        # Include request context information if available
-        context = request_context.get()
+        # Include request context information if available, as captured when
+        # the record was queued
+        context = getattr(record, "request_context", None) or request_context.get()
         if context:
             for key, value in context.items():
                 # Don't overwrite existing keys
@@ -61,6 +79,20 @@ class JsonFormatter(logging.Formatter):
         return record_dict
 
 
+class ContextQueueHandler(QueueHandler):
+    """
+    Queue handler for a listener in the same process. Records keep their
+    exception info, and the request context is captured before the record
+    leaves the logging thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_context = request_context.get()
+        return record
+
+
 class ContextFilter(logging.Filter):
     """
     Filter that adds request context data to log records.
@@ -91,6 +123,7 @@ def setup_logging(level: Optional[str] = None):
     # Clear existing handlers
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    _stop_queue_listener()
 
     # Add context filter to all loggers
     context_filter = ContextFilter()
@@ -109,7 +142,7 @@ def setup_logging(level: Optional[str] = None):
 
     console_handler.setFormatter(formatter)
     console_handler.setLevel(log_level)
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # Add file handler if LOG_FILE is set
     if settings.LOG_FILE:
@@ -123,10 +156,18 @@ def setup_logging(level: Optional[str] = None):
             file_handler = logging.FileHandler(settings.LOG_FILE)
             file_handler.setFormatter(formatter)
             file_handler.setLevel(log_level)
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
         except Exception as e:
             print(f"Error setting up file logging: {e}")
 
+    # Loggers only enqueue records; a listener thread does the writing, so a
+    # slow stdout or disk never blocks the event loop
+    global _queue_listener
+    log_queue = queue.SimpleQueue()
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    root_logger.addHandler(ContextQueueHandler(log_queue))
+
     # Set specific levels for third-party loggers to reduce noise
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
@@ -1,6 +1,10 @@
 # app/core/security.py
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Union
+import hashlib
+import hmac
+import secrets
+import time
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -12,6 +16,9 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Use the algorithm from settings
 ALGORITHM = settings.JWT_ALGORITHM
 
+# How long an OAuth authorization started by a user stays valid
+OAUTH_STATE_TTL_SECONDS = 600
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -33,3 +40,36 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def create_oauth_state(user_id: int) -> str:
+    """
+    Create a signed OAuth state token carrying the user ID and its expiry.
+    Any instance sharing SECRET_KEY can verify it, so no server-side store is needed.
+    """
+    expires = int(time.time()) + OAUTH_STATE_TTL_SECONDS
+    payload = f"{secrets.token_urlsafe(16)}.{user_id}.{expires}"
+    return f"{payload}.{_sign_oauth_state(payload)}"
+
+
+def verify_oauth_state(state: str) -> Optional[int]:
+    """Return the user ID of a valid, unexpired OAuth state token, else None."""
+    try:
+        nonce, user_id, expires, signature = state.split(".")
+        payload = f"{nonce}.{user_id}.{expires}"
+        # Compare bytes: compare_digest rejects non-ASCII str outright
+        if not hmac.compare_digest(
+            signature.encode(), _sign_oauth_state(payload).encode()
+        ):
+            return None
+        if int(expires) < time.time():
+            return None
+        return int(user_id)
+    except ValueError:
+        return None
+
+
+def _sign_oauth_state(payload: str) -> str:
+    # Derive a separate key so a state token can never pass as an access token
+    key = f"{settings.SECRET_KEY}:oauth_state".encode()
+    return hmac.new(key, payload.encode(), hashlib.sha256).hexdigest()
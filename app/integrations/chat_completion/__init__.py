@@ -1,6 +1,9 @@
-from app.integrations.chat_completion.llm import ChatCompletionService
+from functools import lru_cache
 
+from app.integrations.chat_completion.llm import ChatCompletionService, close_clients
 
+
+@lru_cache(maxsize=4)
 def get_chat_completion_service() -> ChatCompletionService:
     """
     Provides an LLMService instance for dependency injection.
@@ -1,25 +1,247 @@
-# app/services/llm_service.py
-import json
+# app/integrations/chat_completion/llm.py
 import asyncio
-from typing import Dict, Any, Optional, List
-from pydantic import BaseModel
-from openai import OpenAI, AsyncOpenAI
+import orjson
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import (
+    AsyncIterator,
+    Dict,
+    Any,
+    NamedTuple,
+    Optional,
+    List,
+    Sequence,
+    Tuple,
+)
+import httpx
+from openai import (
+    OpenAI,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    APIConnectionError,
+    InternalServerError,
+    RateLimitError,
+)
 import logging
 
 from app.schemas.quest import QuestCreate
 from app.models.quest import QuestRarity, QuestType
 from app.core.config import settings
+from app.utils.concurrency import LoopSemaphore
 
 logger = logging.getLogger(__name__)
 
+# One AsyncOpenAI client per (provider, api_key, base_url), shared by every
+# service instance so requests reuse the client's warm connection pool
+_clients: Dict[Tuple[str, str, str], AsyncOpenAI] = {}
 
-class LLMProvider(BaseModel):
+
+async def close_clients() -> None:
+    """Close the shared LLM clients and their connection pools."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.close()
+
+
+# Upstream requests currently running, keyed like the response cache
+_inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+# Bounds upstream requests across every caller in the process
+_llm_semaphore = LoopSemaphore(settings.LLM_MAX_CONCURRENCY)
+
+# Responses keyed by a hash of everything that shapes the request:
+# key -> (time.monotonic() expiry, response)
+_response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+
+def _response_cache_key(
+    prompt: str,
+    system_prompt: str,
+    temperature: float,
+    json_response: bool,
+    model: str,
+    tool: Optional[Dict[str, Any]] = None,
+) -> str:
+    request = orjson.dumps(
+        [model, system_prompt, prompt, temperature, json_response, tool]
+    )
+    return hashlib.sha256(request).hexdigest()
+
+
+def _get_cached_response(key: str) -> Optional[str]:
+    cached = _response_cache.get(key)
+    if cached is None:
+        return None
+    if time.monotonic() >= cached[0]:
+        _response_cache.pop(key, None)
+        return None
+    _response_cache.move_to_end(key)
+    return cached[1]
+
+
+def _cache_response(key: str, response: str) -> None:
+    expires = time.monotonic() + settings.LLM_RESPONSE_CACHE_TTL
+    _response_cache[key] = (expires, response)
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > settings.LLM_RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+
+
+# Connection pool for the shared clients. Idle connections are kept for a
+# minute, up to the full pool, instead of the SDK's 100 for 5 seconds, so
+# bursts of parses reuse warm TLS connections
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=1000, max_keepalive_connections=1000, keepalive_expiry=60
+)
+
+# Sent with every request through the provider's shared client
+_PROVIDER_HEADERS = {
+    "openrouter": {
+        "HTTP-Referer": "https://questlogger.app",
+        "X-Title": "Quest Logger",
+    },
+}
+
+_JSON_FORMAT_TEXT = "You must respond with a JSON object, nothing else."
+
+
+@lru_cache(maxsize=64)
+def _system_message(content: str) -> Dict[str, str]:
+    """Shared system message for a prompt. Callers must not mutate it."""
+    return {"role": "system", "content": content}
+
+
+def _checkpoint_key(item: Tuple[str, Optional[str], str]) -> str:
+    return hashlib.blake2b(orjson.dumps(item), digest_size=16).hexdigest()
+
+
+def _load_checkpoint(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Results recorded in a batch parse checkpoint, keyed by item. A partial
+    last line is cut off, so the next append starts on a line of its own.
+    """
+    completed = {}
+    try:
+        with open(path, "r+b") as f:
+            size = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A crash mid-write leaves a partial last line
+                    f.truncate(size)
+                    break
+                size += len(line)
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                completed[entry["key"]] = entry["result"]
+    except FileNotFoundError:
+        pass
+    return completed
+
+
+def _append_checkpoint(path: str, line: bytes) -> None:
+    with open(path, "ab") as f:
+        f.write(line + b"\n")
+
+
+class LLMProvider(NamedTuple):
     name: str
     api_key: str
     base_url: str
     default_model: str
 
 
+# Case-folded values the LLM may return, mapped to their enum members
+_RARITIES = {rarity.value: rarity for rarity in QuestRarity}
+_QUEST_TYPES = {quest_type.value: quest_type for quest_type in QuestType}
+
+
+_WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+# Quest fields the model fills in, with the guidance it used to get from the
+# prompt. Everything else on QuestCreate keeps its schema default
+_PARSED_QUEST_FIELDS = {
+    "title": "Brief task name, at most 20 characters",
+    "description": (
+        "Markdown. Single task: '#### Task details' and 1-2 sentences. "
+        "Multiple tasks: '#### Summary' then one concise '- [ ] subtask' per "
+        "line. Drop phrases like 'I need to'"
+    ),
+    "due_date": (
+        "ISO 8601 UTC (YYYY-MM-DDTHH:MM:SSZ); 23:59:59 if no time is given, "
+        "null if no date is given"
+    ),
+    "rarity": "Default common",
+    "quest_type": "Default regular",
+    "priority": "1-100, default 33",
+}
+
+
+def _build_quest_tool() -> Dict[str, Any]:
+    """Function-calling definition for the parsed quest, from QuestCreate."""
+    schema = QuestCreate.model_json_schema()
+    properties = {}
+    for name, description in _PARSED_QUEST_FIELDS.items():
+        field = {
+            key: value
+            for key, value in schema["properties"][name].items()
+            if key not in ("title", "default")
+        }
+        properties[name] = {**field, "description": description}
+
+    return {
+        "type": "function",
+        "function": {
+            "name": "create_quest",
+            "description": "Create a quest from a voice command",
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": ["title"],
+            },
+        },
+    }
+
+
+_QUEST_TOOL = _build_quest_tool()
+
+
+@lru_cache(maxsize=1024)
+def _build_parse_system_prompt(
+    current_time: datetime, language: Optional[str], country: Optional[str]
+) -> str:
+    """
+    Build the quest parsing system prompt. Callers pass the time truncated to
+    the minute, so requests within a minute share one identical prompt.
+    Field rules live in the create_quest tool schema.
+    """
+    # Days until the next occurrence of each weekday, from one weekday() read
+    today_weekday = current_time.weekday()
+    base = current_time.date()
+    next_weekdays = "\n    ".join(
+        f"Next {name}: {base + timedelta(days=(weekday - today_weekday - 1) % 7 + 1)}"
+        for weekday, name in enumerate(_WEEKDAY_NAMES)
+    )
+
+    language = language or "the language of the voice command"
+    # Dates like 03/04 and holidays depend on where the user is
+    locale = f"\n    The user is in {country}." if country else ""
+
+    return f"""
+    Extract the task in a voice command and call create_quest. Write text fields in {language}.{locale}
+
+    Now: {current_time.isoformat()} ({_WEEKDAY_NAMES[today_weekday]})
+    Tomorrow: {base + timedelta(days=1)}
+    {next_weekdays}
+    """
+
+
 class ChatCompletionService:
     """
     Service for interacting with LLMs through OpenRouter or OpenAI
@@ -29,10 +251,19 @@ class ChatCompletionService:
     def __init__(self, provider: str = "openrouter"):
         self.provider = self._get_provider_config(provider)
 
-        # Initialize AsyncOpenAI client
-        self.client = AsyncOpenAI(
-            api_key=self.provider.api_key, base_url=self.provider.base_url
-        )
+        # Reuse the process-wide AsyncOpenAI client for this provider. The SDK
+        # retries 429/5xx/connection errors with jittered exponential backoff
+        # and honors Retry-After
+        key = (self.provider.name, self.provider.api_key, self.provider.base_url)
+        self.client = _clients.get(key)
+        if self.client is None:
+            self.client = _clients[key] = AsyncOpenAI(
+                api_key=self.provider.api_key,
+                base_url=self.provider.base_url,
+                max_retries=settings.LLM_MAX_RETRIES,
+                default_headers=_PROVIDER_HEADERS.get(self.provider.name),
+                http_client=DefaultAsyncHttpxClient(limits=_HTTP_LIMITS),
+            )
 
     def _get_provider_config(self, provider_name: str) -> LLMProvider:
         """
@@ -62,6 +293,8 @@ class ChatCompletionService:
         temperature: float = 0.7,
         json_response: bool = False,
         model: Optional[str] = None,
+        fallback_models: Sequence[str] = (),
+        tool: Optional[Dict[str, Any]] = None,
     ) -> Optional[str]:
         """
         Call the LLM API with the given prompt.
@@ -72,13 +305,14 @@ class ChatCompletionService:
             temperature: Temperature parameter for response randomness
             json_response: Whether to request a JSON response
             model: Specific model to use, or None for default
+            fallback_models: Models tried in order when the previous one is
+                rate limited, unavailable or returns invalid JSON
+            tool: Function definition the model must call
 
         Returns:
-            Response text from the LLM, or None if an error occurred
+            Response text from the LLM, or the JSON arguments of the tool
+            call, or None if an error occurred
         """
-        from app.utils.timeout import with_timeout
-        from app.core.exceptions import ProcessingException
-
         if not settings.ENABLE_LLM_FEATURES:
             logger.warning("LLM features are disabled in settings")
             return None
@@ -86,57 +320,84 @@ class ChatCompletionService:
         if not model:
             model = settings.OPENROUTER_DEFAULT_MODEL
 
+        # Repeated requests (e.g. translating the same text) skip the round-trip
+        key = _response_cache_key(
+            prompt, system_prompt, temperature, json_response, model, tool
+        )
+        if settings.LLM_RESPONSE_CACHE_ENABLED:
+            cached = _get_cached_response(key)
+            if cached is not None:
+                logger.info(f"Using cached LLM response for model: {model}")
+                return cached
+
+        # Identical requests already in flight share one upstream call. The
+        # call runs as its own task, so cancelling one caller doesn't cancel
+        # it for the others
+        request = _inflight.get(key)
+        if request is None:
+            request = asyncio.ensure_future(
+                self._request_completion(
+                    key,
+                    prompt,
+                    system_prompt,
+                    temperature,
+                    json_response,
+                    (model, *fallback_models),
+                    tool,
+                )
+            )
+            _inflight[key] = request
+            request.add_done_callback(lambda _: _inflight.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight LLM request for model: {model}")
+        return await asyncio.shield(request)
+
+    async def _request_completion(
+        self,
+        key: str,
+        prompt: str,
+        system_prompt: str,
+        temperature: float,
+        json_response: bool,
+        models: Sequence[str],
+        tool: Optional[Dict[str, Any]],
+    ) -> Optional[str]:
+        """Request a completion from the first model that answers."""
+        from app.core.exceptions import ProcessingException
+
+        if json_response:
+            system_prompt = f"{system_prompt} {_JSON_FORMAT_TEXT}"
         messages = [
-            {"role": "system", "content": system_prompt},
+            _system_message(system_prompt),
             {"role": "user", "content": prompt},
         ]
 
         try:
-            headers = {
-                "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
-            }
-
-            json_format_text = ""
-            if json_response:
-                json_format_text = "You must respond with a JSON object, nothing else."
-                messages[0]["content"] = f"{system_prompt} {json_format_text}"
-                # Add JSON response formatting
-                headers["HTTP-Referer"] = "https://questlogger.app"
-                headers["X-Title"] = "Quest Logger"
-
-            logger.info(
-                f"Calling LLM API with model: {model}, json_response: {json_response}"
-            )
-
-            # Use the async client that was initialized in __init__
-            try:
-                # Use AsyncOpenAI client for proper async operation
-                response = await self.client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    temperature=temperature,
-                    response_format={"type": "json_object"} if json_response else None,
-                    timeout=settings.LLM_TIMEOUT,
+            for attempt_model in models:
+                logger.info(
+                    f"Calling LLM API with model: {attempt_model}, json_response: {json_response}"
                 )
 
-                # Extract the response text
-                content = response.choices[0].message.content
+                try:
+                    content = await self._create_completion(
+                        attempt_model, messages, temperature, json_response, tool
+                    )
+                except (RateLimitError, APIConnectionError, InternalServerError) as e:
+                    # Transient provider failure; the next model may still answer
+                    logger.warning(f"LLM model {attempt_model} unavailable: {e}")
+                    continue
 
-                if json_response:
-                    # Validate JSON format for json_response=True
-                    try:
-                        json.loads(content)
-                    except json.JSONDecodeError:
-                        logger.error(
-                            f"Invalid JSON response from LLM: {content[:100]}..."
-                        )
-                        return None
+                if content is None:
+                    continue
 
+                if settings.LLM_RESPONSE_CACHE_ENABLED:
+                    _cache_response(key, content)
                 return content
-            except asyncio.TimeoutError:
-                logger.error(f"LLM API call timed out (limit: {settings.LLM_TIMEOUT}s)")
-                raise ProcessingException("LLM API call timed out")
 
+            return None
+        except asyncio.TimeoutError:
+            logger.error(f"LLM API call timed out (limit: {settings.LLM_TIMEOUT}s)")
+            return None
         except ProcessingException as e:
             # Already logged in timeout utility
             return None
@@ -144,6 +405,135 @@ class ChatCompletionService:
             logger.error(f"Error calling LLM API: {str(e)}", exc_info=True)
             return None
 
+    async def _create_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        json_response: bool,
+        tool: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
+        """
+        Request one completion from the given model.
+        Returns None if a JSON response or tool call was requested but not
+        returned.
+        """
+        options: Dict[str, Any] = {}
+        if tool is not None:
+            # Force the call so the provider returns typed arguments
+            options["tools"] = [tool]
+            options["tool_choice"] = {
+                "type": "function",
+                "function": {"name": tool["function"]["name"]},
+            }
+        elif json_response:
+            options["response_format"] = {"type": "json_object"}
+
+        # Use the shared async client picked in __init__
+        async with _llm_semaphore:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                timeout=settings.LLM_TIMEOUT,
+                **options,
+            )
+
+        # Extract the response text, or the arguments of the forced tool call
+        message = response.choices[0].message
+        if tool is not None:
+            content = (
+                message.tool_calls[0].function.arguments
+                if message.tool_calls
+                else None
+            )
+        else:
+            content = message.content
+
+        if json_response or tool is not None:
+            # Validate JSON format for json_response=True
+            try:
+                orjson.loads(content)
+            except (orjson.JSONDecodeError, TypeError):
+                logger.error(
+                    f"Invalid JSON response from {model}: {str(content)[:100]}..."
+                )
+                return None
+
+        return content
+
+    def _model_pool(self, configured_models: Sequence[str]) -> List[str]:
+        """Configured models for a task, falling back to the provider default."""
+        return list(dict.fromkeys([*configured_models, self.provider.default_model]))
+
+    async def stream_llm_api(
+        self,
+        prompt: str,
+        system_prompt: str = "You are a helpful assistant.",
+        temperature: float = 0.7,
+        model: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Call the LLM API and yield the response text as it is generated.
+
+        Args:
+            prompt: User prompt to send to the LLM
+            system_prompt: System instructions for the LLM
+            temperature: Temperature parameter for response randomness
+            model: Specific model to use, or None for default
+
+        Yields:
+            Chunks of response text; nothing if an error occurred
+        """
+        if not settings.ENABLE_LLM_FEATURES:
+            logger.warning("LLM features are disabled in settings")
+            return
+
+        if not model:
+            model = settings.OPENROUTER_DEFAULT_MODEL
+
+        cache_key = None
+        if settings.LLM_RESPONSE_CACHE_ENABLED:
+            cache_key = _response_cache_key(
+                prompt, system_prompt, temperature, False, model
+            )
+            cached = _get_cached_response(cache_key)
+            if cached is not None:
+                logger.info(f"Using cached LLM response for model: {model}")
+                yield cached
+                return
+
+        messages = [
+            _system_message(system_prompt),
+            {"role": "user", "content": prompt},
+        ]
+
+        logger.info(f"Streaming LLM API with model: {model}")
+
+        chunks = []
+        try:
+            async with _llm_semaphore:
+                stream = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    stream=True,
+                    timeout=settings.LLM_TIMEOUT,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        chunks.append(content)
+                        yield content
+        except Exception as e:
+            logger.error(f"Error streaming LLM API: {str(e)}", exc_info=True)
+            return
+
+        if cache_key is not None and chunks:
+            _cache_response(cache_key, "".join(chunks))
+
     async def translate_text(
         self, text: str, source_language: str, target_language: str = "english"
     ) -> str:
@@ -158,6 +548,29 @@ class ChatCompletionService:
         Returns:
             Translated text
         """
+        # Make the API call with the specified model
+        translation = await self.call_llm_api(
+            **self._translation_request(text, source_language, target_language)
+        )
+
+        return translation
+
+    async def translate_text_stream(
+        self, text: str, source_language: str, target_language: str = "english"
+    ) -> AsyncIterator[str]:
+        """
+        Translate text like translate_text, yielding the translation as it is
+        generated so it can be sent through a StreamingResponse.
+        """
+        async for chunk in self.stream_llm_api(
+            **self._translation_request(text, source_language, target_language)
+        ):
+            yield chunk
+
+    def _translation_request(
+        self, text: str, source_language: str, target_language: str
+    ) -> Dict[str, Any]:
+        """Build the call_llm_api arguments for a translation."""
         system_prompt = """
         You are a helpful translation assistant. Your task is to translate the provided text
         accurately, maintaining the meaning and intent of the original text.
@@ -171,24 +584,24 @@ class ChatCompletionService:
         {text}
         """
 
-        # Use a lighter model for translation if configured
-        model = (
-            getattr(settings, "OPENROUTER_TRANSLATION_MODEL", None)
-            or self.provider.default_model
+        # Use lighter models for translation if configured
+        model, *fallback_models = self._model_pool(
+            settings.OPENROUTER_TRANSLATION_MODELS
         )
 
-        # Make the API call with the specified model
-        translation = await self.call_llm_api(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=0.3,  # Lower temperature for more accurate translation
-            model=model,
-        )
-
-        return translation
+        return {
+            "prompt": prompt,
+            "system_prompt": system_prompt,
+            "temperature": 0.3,  # Lower temperature for more accurate translation
+            "model": model,
+            "fallback_models": fallback_models,
+        }
 
     async def parse_quest_from_text(
-        self, text: str, language: Optional[str], country: str
+        self,
+        text: str,
+        language: Optional[str] = None,
+        country: Optional[str] = None,
     ) -> QuestCreate:
         """
         Use an LLM to parse a quest from text input
@@ -201,145 +614,111 @@ class ChatCompletionService:
         Returns:
             QuestCreate object with structured quest data
         """
-        from datetime import datetime, timezone, timedelta
-        import calendar
-
-        current_time = datetime.now(timezone.utc)
-        current_time_iso = current_time.replace(microsecond=0).isoformat()
-
-        # Helper functions for date calculations
-        def next_weekday(current_date, weekday):
-            """Find the next occurrence of a specific weekday"""
-            days_ahead = weekday - current_date.weekday()
-            if days_ahead <= 0:  # Target day already happened this week
-                days_ahead += 7
-            return (current_date + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-
-        def this_weekday(current_date, weekday):
-            """Find this week's occurrence of a specific weekday"""
-            days_ahead = weekday - current_date.weekday()
-            if days_ahead < 0:  # Target day already happened this week
-                days_ahead += 7
-            return (current_date + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
-
-        def next_month(current_date):
-            """Get the first day of next month"""
-            if current_date.month == 12:
-                return f"{current_date.year + 1}-01-01"
-            else:
-                return f"{current_date.year}-{current_date.month + 1:02d}-01"
-
-        def end_of_month(current_date):
-            """Get the last day of current month"""
-            last_day = calendar.monthrange(current_date.year, current_date.month)[1]
-            return f"{current_date.year}-{current_date.month:02d}-{last_day}"
-
-        system_prompt = f"""
-        You extract task data from voice commands into quest objects. ALWAYS format response as JSON.
-
-        Current: {current_time_iso} ({current_time.strftime('%Y-%m-%d')}, {['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][current_time.weekday()]})
-
-        Date reference:
-        - Today: {current_time.strftime('%Y-%m-%d')}
-        - Tomorrow: {(current_time + timedelta(days=1)).strftime('%Y-%m-%d')}
-        - Next Mon: {next_weekday(current_time, 0)}
-        - Next Tue: {next_weekday(current_time, 1)}
-        - Next Wed: {next_weekday(current_time, 2)}
-        - Next Thu: {next_weekday(current_time, 3)}
-        - Next Fri: {next_weekday(current_time, 4)}
-        - Next Sat: {next_weekday(current_time, 5)}
-        - Next Sun: {next_weekday(current_time, 6)}
-
-        Extract these fields in {language}:
-        - title: Brief task name (MAXIMUM 20 CHARACTERS. NOT MORE. WONT WORK OTHERWISE)
-        - description: Format based on complexity:
-          * FOR SINGLE TASKS: Just "#### Task details" with 1-2 sentences
-          * FOR MULTIPLE TASKS: "#### Summary" followed by "- [ ] subtask1" etc.
-          * FOR MULTIPLE TASKS: Sub tasks must be kept concise and brief to the point
-          * Always remove "I need to", "I have to", and similar phrases
-        - due_date: ISO format (YYYY-MM-DDTHH:MM:SSZ)
-          * IMPORTANT: If specific date mentioned (e.g., Monday, Friday, tomorrow), calculate correctly
-          * If no time specified, use 23:59:59
-          * If no date, set to null
-        - rarity: common/uncommon/rare/epic/legendary (default: common)
-        - quest_type: daily/regular/epic/boss (default: regular)
-        - priority: 1-100 (default: 33)
-
-        Examples:
-        1. SINGLE TASK: "Dentist appointment on Friday at 2pm"
-        {{
-          "title": "Dentist appointment",
-          "description": "#### Dental visit\\nGo to dentist office on Friday at 2pm",
-          "due_date": "{(current_time.replace(hour=14, minute=0, second=0) + timedelta(days=(4-current_time.weekday()) % 7)).strftime('%Y-%m-%dT%H:%M:%SZ')}",
-          "rarity": "common",
-          "quest_type": "regular",
-          "priority": 40
-        }}
-
-        2. MULTIPLE TASKS: "Work on app: add markdown, create daily system, improve mobile UI"
-        {{
-          "title": "App improvements",
-          "description": "#### App development\\n- [ ] Add markdown support\\n- [ ] Create daily system\\n- [ ] Improve mobile UI",
-          "due_date": null,
-          "rarity": "uncommon",
-          "quest_type": "regular",
-          "priority": 40
-        }}
-
-        Return valid JSON ONLY. Match input language in output.
-        """
+        current_time = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        system_prompt = _build_parse_system_prompt(
+            current_time, language, country
+        )
 
         try:
-            # Use a lighter model for parsing if configured
-            model = (
-                getattr(settings, "OPENROUTER_PARSING_MODEL", None)
-                or self.provider.default_model
+            # Use lighter models for parsing if configured, falling back on
+            # rate limits, outages and malformed JSON
+            model, *fallback_models = self._model_pool(
+                settings.OPENROUTER_PARSING_MODELS
             )
             response = await self.call_llm_api(
-                prompt=f"Convert this voice command to a quest: {text}",
+                prompt=text,
                 system_prompt=system_prompt,
-                json_response=True,
                 model=model,
+                fallback_models=fallback_models,
+                tool=_QUEST_TOOL,
             )
 
-            # Parse the JSON response
-            if settings.ENVIRONMENT != "production":
-                logger.debug(f"LLM response for quest parsing: {response}")
+            # Parse the tool call arguments
+            logger.debug(
+                "LLM response for quest parsing: %d chars", len(response or "")
+            )
+            if settings.LLM_DEBUG_PAYLOADS:
+                logger.debug("LLM response for quest parsing: %s", response)
 
-            quest_data = json.loads(response)
+            quest_data = orjson.loads(response)
 
-            # Safely handle enum conversions with case insensitivity
+            # Not every provider enforces the schema, so still coerce enums
+            # with case insensitivity
             if "rarity" in quest_data:
-                try:
-                    quest_data["rarity"] = QuestRarity(quest_data["rarity"].lower())
-                except (ValueError, KeyError):
+                rarity = _RARITIES.get(str(quest_data["rarity"]).lower())
+                if rarity is None:
                     logger.warning(
-                        f"Invalid rarity value in LLM response: {quest_data.get('rarity')}, defaulting to COMMON"
+                        f"Invalid rarity value in LLM response: {quest_data['rarity']}, defaulting to COMMON"
                     )
-                    quest_data["rarity"] = QuestRarity.COMMON
+                    rarity = QuestRarity.COMMON
+                quest_data["rarity"] = rarity
 
             if "quest_type" in quest_data:
-                try:
-                    quest_data["quest_type"] = QuestType(
-                        quest_data["quest_type"].lower()
-                    )
-                except (ValueError, KeyError):
+                quest_type = _QUEST_TYPES.get(str(quest_data["quest_type"]).lower())
+                if quest_type is None:
                     logger.warning(
-                        f"Invalid quest_type value in LLM response: {quest_data.get('quest_type')}, defaulting to REGULAR"
+                        f"Invalid quest_type value in LLM response: {quest_data['quest_type']}, defaulting to REGULAR"
                     )
-                    quest_data["quest_type"] = QuestType.REGULAR
+                    quest_type = QuestType.REGULAR
+                quest_data["quest_type"] = quest_type
 
-            # Ensure due_date is parsed as UTC datetime or None
-            if "due_date" in quest_data:
+            # Parse due_date as a datetime; a missing or invalid one falls back
+            # to the schema default
+            due_date = quest_data.pop("due_date", None)
+            if isinstance(due_date, str):
                 try:
-                    quest_data["due_date"] = datetime.fromisoformat(
-                        quest_data["due_date"]
-                    )
-                except (ValueError, TypeError):
-                    del quest_data["due_date"]
+                    quest_data["due_date"] = datetime.fromisoformat(due_date)
+                except ValueError:
+                    pass
 
             # Create and return QuestCreate object
             return QuestCreate(**quest_data)
 
         except Exception as e:
             raise ValueError(f"Error parsing quest from text: {e}")
+
+    async def parse_quests_from_text(
+        self,
+        items: List[Tuple[str, Optional[str], str]],
+        max_workers: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+    ) -> List[Any]:
+        """
+        Parse several quests concurrently.
+
+        Args:
+            items: (text, language, country) arguments for parse_quest_from_text
+            max_workers: Maximum requests in flight, defaults to LLM_MAX_CONCURRENCY
+            checkpoint_path: JSONL file recording each parsed quest. Items
+                already in it are not sent again, so an interrupted run can
+                be resumed with the same file
+
+        Returns:
+            A QuestCreate or the raised exception for each item, in input order
+        """
+        semaphore = asyncio.Semaphore(max_workers or settings.LLM_MAX_CONCURRENCY)
+        completed: Dict[str, Dict[str, Any]] = {}
+        if checkpoint_path:
+            completed = await asyncio.to_thread(_load_checkpoint, checkpoint_path)
+        checkpoint_lock = asyncio.Lock()
+
+        async def parse_one(item: Tuple[str, Optional[str], str]) -> QuestCreate:
+            key = _checkpoint_key(item)
+            if key in completed:
+                return QuestCreate.model_validate(completed[key])
+
+            async with semaphore:
+                quest = await self.parse_quest_from_text(*item)
+
+            if checkpoint_path:
+                line = orjson.dumps(
+                    {"key": key, "result": quest.model_dump(mode="json")}
+                )
+                async with checkpoint_lock:
+                    await asyncio.to_thread(_append_checkpoint, checkpoint_path, line)
+            return quest
+
+        # One failure (e.g. a 429) must not cancel the rest of the batch
+        return await asyncio.gather(
+            *(parse_one(item) for item in items), return_exceptions=True
+        )
@@ -1,31 +1,93 @@
 # app/integrations/google/calendar.py
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from app.models.google_calendar import GoogleCalendarIntegration
 from app.models.quest import Quest
 from app.integrations.google.oauth import GoogleOAuthClient
-from datetime import datetime, timedelta
+from app.core.config import settings
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 
+import hashlib
+import httplib2
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Built API resources per integration and access token, so a user's calendar
+# calls reuse one resource until the token rotates. Resources wrap an httplib2
+# connection, which is not thread-safe, so each worker thread keeps its own
+# bounded cache.
+SERVICE_CACHE_SIZE = 256
+_service_cache = threading.local()
+
+
+def _shared_http() -> httplib2.Http:
+    """
+    Return this thread's httplib2 connection pool. Every user's resource on the
+    thread wraps it, so keep-alive connections to Google are reused across
+    users and token refreshes instead of opening a new TLS session per client.
+    """
+    http = getattr(_service_cache, "http", None)
+    if http is None:
+        http = _service_cache.http = httplib2.Http(timeout=settings.DEFAULT_TIMEOUT)
+    return http
+
+
+def _service_cache_key(integration: GoogleCalendarIntegration) -> tuple:
+    token_hash = hashlib.sha256(integration.access_token.encode()).hexdigest()
+    return integration.id, token_hash
+
+
+def _event_time(value: datetime) -> dict:
+    """Format a datetime as a Calendar API time, treating naive values as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return {"dateTime": value.isoformat(), "timeZone": "UTC"}
+
 
 class GoogleCalendarClient:
     """Client for Google Calendar API."""
 
-    def __init__(self, credentials: Credentials):
-        """Initialize with valid Google OAuth credentials."""
-        self.service = build("calendar", "v3", credentials=credentials)
+    def __init__(self, credentials: Credentials = None, service=None):
+        """Initialize with valid Google OAuth credentials or a built service."""
+        # Use the discovery document bundled with google-api-python-client
+        # instead of fetching it over HTTP on every build
+        self.service = service or build(
+            "calendar",
+            "v3",
+            http=AuthorizedHttp(credentials, http=_shared_http()),
+            static_discovery=True,
+            cache_discovery=False,
+        )
 
     @classmethod
     def from_integration(cls, integration: GoogleCalendarIntegration):
         """Create a client from a GoogleCalendarIntegration record."""
+        if not integration or not integration.access_token:
+            return None
+
+        cache = getattr(_service_cache, "services", None)
+        if cache is None:
+            cache = _service_cache.services = OrderedDict()
+
+        key = _service_cache_key(integration)
+        service = cache.get(key)
+        if service is not None:
+            cache.move_to_end(key)
+            return cls(service=service)
+
         credentials = GoogleOAuthClient.get_credentials(integration)
         if not credentials:
             return None
 
-        return cls(credentials)
+        client = cls(credentials)
+        cache[key] = client.service
+        if len(cache) > SERVICE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return client
 
     def list_calendars(self, max_results=100):
         """List available calendars."""
@@ -53,34 +115,17 @@ class GoogleCalendarClient:
 
             if quest.due_date:
                 start_time = quest.due_date
-                end_time = quest.due_date + timedelta(hours=1)
             else:
                 # If no due date, use current time + 1 hour
-                start_time = datetime.utcnow()
-                end_time = start_time + timedelta(hours=1)
-
-            # Format times as RFC3339 strings
-            start_time_str = start_time.isoformat()
-            end_time_str = end_time.isoformat()
-
-            # Add timezone if not present
-            if "Z" not in start_time_str and "+" not in start_time_str:
-                start_time_str += "Z"
-            if "Z" not in end_time_str and "+" not in end_time_str:
-                end_time_str += "Z"
+                start_time = datetime.now(timezone.utc)
+            end_time = start_time + timedelta(hours=1)
 
             # Create event details
             event = {
                 "summary": f"Quest: {quest.title}",
                 "description": quest.description or "",
-                "start": {
-                    "dateTime": start_time_str,
-                    "timeZone": "UTC",
-                },
-                "end": {
-                    "dateTime": end_time_str,
-                    "timeZone": "UTC",
-                },
+                "start": _event_time(start_time),
+                "end": _event_time(end_time),
                 "reminders": {"useDefault": True},
             }
 
@@ -100,11 +145,21 @@ class GoogleCalendarClient:
     def update_event(self, event_id: str, quest: Quest, calendar_id="primary"):
         """Update an existing calendar event based on a quest."""
         try:
-            # First retrieve the existing event
+            # Patch only the fields derived from the quest, so the event does
+            # not need to be fetched first
+            event = {
+                "summary": f"Quest: {quest.title}",
+                "description": quest.description or "",
+            }
+
+            if quest.due_date:
+                event["start"] = _event_time(quest.due_date)
+                event["end"] = _event_time(quest.due_date + timedelta(hours=1))
+
             try:
-                event = (
+                updated_event = (
                     self.service.events()
-                    .get(calendarId=calendar_id, eventId=event_id)
+                    .patch(calendarId=calendar_id, eventId=event_id, body=event)
                     .execute()
                 )
             except Exception as e:
@@ -114,13 +169,12 @@ class GoogleCalendarClient:
                         logger.info(
                             f"Event not found in specified calendar, trying primary"
                         )
-                        event = (
+                        calendar_id = "primary"
+                        updated_event = (
                             self.service.events()
-                            .get(calendarId="primary", eventId=event_id)
+                            .patch(calendarId=calendar_id, eventId=event_id, body=event)
                             .execute()
                         )
-                        # Update calendar_id for this operation
-                        calendar_id = "primary"
                     except Exception as inner_e:
                         logger.error(
                             f"Event not found in primary calendar either: {inner_e}"
@@ -130,39 +184,6 @@ class GoogleCalendarClient:
                     logger.error(f"Event not found: {e}")
                     return None
 
-            # Update event details
-            event["summary"] = f"Quest: {quest.title}"
-            event["description"] = quest.description or ""
-
-            if quest.due_date:
-                start_time = quest.due_date
-                end_time = quest.due_date + timedelta(hours=1)
-
-                # Format times as RFC3339 strings
-                start_time_str = start_time.isoformat()
-                end_time_str = end_time.isoformat()
-
-                # Add timezone if not present
-                if "Z" not in start_time_str and "+" not in start_time_str:
-                    start_time_str += "Z"
-                if "Z" not in end_time_str and "+" not in end_time_str:
-                    end_time_str += "Z"
-
-                event["start"] = {
-                    "dateTime": start_time_str,
-                    "timeZone": "UTC",
-                }
-                event["end"] = {
-                    "dateTime": end_time_str,
-                    "timeZone": "UTC",
-                }
-
-            updated_event = (
-                self.service.events()
-                .update(calendarId=calendar_id, eventId=event_id, body=event)
-                .execute()
-            )
-
             logger.info(
                 f"Updated event {updated_event.get('id')} in calendar {calendar_id}"
             )
@@ -206,7 +227,7 @@ class GoogleCalendarClient:
     def list_events(self, calendar_id="primary", max_results=10):
         """List upcoming events in a calendar."""
         try:
-            now = datetime.utcnow().isoformat() + "Z"
+            now = datetime.now(timezone.utc).isoformat()
             events_result = (
                 self.service.events()
                 .list(
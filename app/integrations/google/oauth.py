@@ -5,15 +5,20 @@ from google.auth.transport.requests import Request
 from app.core.config import settings
 from app.models.google_calendar import GoogleCalendarIntegration
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 import json
-import os
-import tempfile
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _parse_client_secrets(client_secrets_json: str) -> dict:
+    """Parse the client secrets JSON once; keyed on the raw string."""
+    return json.loads(client_secrets_json)
+
+
 class GoogleOAuthClient:
     """Client for Google OAuth authentication."""
 
@@ -34,30 +39,20 @@ class GoogleOAuthClient:
                     f"{settings.SERVER_HOST}{settings.API_V1_STR}/auth/google/callback"
                 )
 
-            # Create a temporary file with the JSON content
-            fd, path = tempfile.mkstemp()
-            try:
-                with os.fdopen(fd, "w") as tmp:
-                    # Write the JSON string to the temp file
-                    tmp.write(settings.GOOGLE_CLIENT_SECRETS_JSON)
-
-                # Create flow from the temporary file
-                return Flow.from_client_secrets_file(
-                    path,
-                    scopes=[
-                        "https://www.googleapis.com/auth/calendar.readonly",
-                        "https://www.googleapis.com/auth/calendar.events",
-                    ],
-                    redirect_uri=redirect_uri,
-                )
-            finally:
-                # Clean up the temp file
-                os.unlink(path)
+            # Build the flow from the parsed config; the secrets never touch disk
+            return Flow.from_client_config(
+                _parse_client_secrets(settings.GOOGLE_CLIENT_SECRETS_JSON),
+                scopes=[
+                    "https://www.googleapis.com/auth/calendar.readonly",
+                    "https://www.googleapis.com/auth/calendar.events",
+                ],
+                redirect_uri=redirect_uri,
+            )
         except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in GOOGLE_CLIENT_SECRETS_JSON: {e}")
+            logger.error("Invalid JSON in GOOGLE_CLIENT_SECRETS_JSON: %s", e)
             raise ValueError("Invalid Google OAuth credentials JSON") from e
         except Exception as e:
-            logger.error(f"Error creating OAuth flow from JSON string: {e}")
+            logger.error("Error creating OAuth flow from JSON string: %s", e)
             raise
 
     @staticmethod
@@ -71,7 +66,7 @@ class GoogleOAuthClient:
     def get_client_config():
         """Extract client ID and secret from the environment."""
         try:
-            client_secrets = json.loads(settings.GOOGLE_CLIENT_SECRETS_JSON)
+            client_secrets = _parse_client_secrets(settings.GOOGLE_CLIENT_SECRETS_JSON)
             web_config = client_secrets.get("web", {})
             client_id = web_config.get("client_id")
             client_secret = web_config.get("client_secret")
@@ -84,7 +79,7 @@ class GoogleOAuthClient:
 
             return client_id, client_secret
         except (json.JSONDecodeError, AttributeError) as e:
-            logger.error(f"Error parsing client secrets JSON: {e}")
+            logger.error("Error parsing client secrets JSON: %s", e)
             return None, None
 
     @staticmethod
@@ -114,7 +109,7 @@ class GoogleOAuthClient:
         """Refresh an expired OAuth token."""
         if not integration.refresh_token:
             logger.warning(
-                f"No refresh token available for integration {integration.id}"
+                "No refresh token available for integration %s", integration.id
             )
             return None
 
@@ -144,7 +139,7 @@ class GoogleOAuthClient:
             return credentials
         except Exception as e:
             logger.error(
-                f"Error refreshing token for integration {integration.id}: {e}"
+                "Error refreshing token for integration %s: %s", integration.id, e
             )
             return None
 
@@ -156,7 +151,7 @@ class GoogleOAuthClient:
         elif isinstance(expiry, (int, float)):
             return datetime.fromtimestamp(expiry)
         else:
-            logger.warning(f"Unexpected type for expiry: {type(expiry)}")
+            logger.warning("Unexpected type for expiry: %s", type(expiry))
             return datetime.now(timezone.utc) + timedelta(hours=1)
 
     @staticmethod
@@ -181,9 +176,9 @@ class GoogleOAuthClient:
                 return True
             else:
                 logger.error(
-                    f"Failed to revoke token: {response.status_code} {response.text}"
+                    "Failed to revoke token: %s %s", response.status_code, response.text
                 )
                 return False
         except Exception as e:
-            logger.error(f"Error revoking Google OAuth token: {e}")
+            logger.error("Error revoking Google OAuth token: %s", e)
             return False
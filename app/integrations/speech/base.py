@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from fastapi import UploadFile
 import tempfile
 import os
@@ -56,6 +56,27 @@ class BaseSTTClient(ABC):
         """
         pass
 
+    @abstractmethod
+    async def transcribe_chunks(
+        self,
+        chunks: List[bytes],
+        mimetype: str,
+        language: Optional[str] = None,
+    ) -> TranscriptionResult:
+        """
+        Transcribe consecutive chunks of one recording concurrently
+
+        Args:
+            chunks: The encoded audio chunks, in order
+            mimetype: MIME type of every chunk
+            language: Optional language hint (ISO code)
+
+        Returns:
+            TranscriptionResult with the joined text and the most common
+            detected language
+        """
+        pass
+
     async def save_upload_file_temp(self, upload_file: UploadFile) -> str:
         """
         Save an upload file to a temporary file and return the path
@@ -1,22 +1,47 @@
 # app/services/speech_to_text/deepgram_service.py
-import os
+import asyncio
+import random
+from collections import Counter
 
-from typing import Optional
+from typing import List, Optional
 from fastapi import UploadFile
 from app.core.config import settings
+from app.utils.concurrency import LoopSemaphore
 from .base import BaseSTTClient, TranscriptionResult
 from enum import StrEnum
 # Import Deepgram SDK
 from deepgram import (
+    DeepgramApiError,
     DeepgramClient,
     PrerecordedOptions,
     FileSource,
 )
+import httpx
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bounds Deepgram requests across every caller in the process, including the
+# chunks of long recordings
+_stt_semaphore = LoopSemaphore(settings.STT_MAX_CONCURRENCY)
+
+# Backoff between retries of transient failures, in seconds
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 8.0
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed Deepgram request is worth retrying"""
+    if isinstance(error, DeepgramApiError):
+        try:
+            status = int(error.status)
+        except (TypeError, ValueError):
+            return False
+        return status in (408, 429) or status >= 500
+    # Timeouts and connection errors
+    return isinstance(error, httpx.TransportError)
+
 # https://developers.deepgram.com/docs/language-detection
 class DeepgramLanguageEnum(StrEnum):
     ES = "es"
@@ -70,19 +95,49 @@ class DeepgramSTTClient(BaseSTTClient):
         Note: translate_to_english parameter is ignored as we delegate translation
         to the LLM service instead
         """
-        temp_file_path = None
+        # Read the upload straight into memory rather than through a temp file
         try:
-            # Save uploaded file to a temporary location
-            temp_file_path = await self.save_upload_file_temp(audio_file)
+            buffer_data = await audio_file.read()
+        finally:
+            await audio_file.seek(0)
 
-            # Read the audio file into a buffer
-            with open(temp_file_path, "rb") as file:
-                buffer_data = file.read()
+        return await self._transcribe_buffer(
+            buffer_data, audio_file.content_type, language
+        )
 
+    async def transcribe_chunks(
+        self,
+        chunks: List[bytes],
+        mimetype: str,
+        language: Optional[DeepgramLanguageEnum] = None,
+    ) -> DeepgramTranscriptionResult:
+        """
+        Transcribe consecutive chunks of one recording concurrently, within
+        the process-wide STT_MAX_CONCURRENCY limit
+        """
+        results = await asyncio.gather(
+            *(self._transcribe_buffer(chunk, mimetype, language) for chunk in chunks)
+        )
+
+        # Chunks detect their language separately; keep the most common one
+        languages = Counter(result.language for result in results if result.language)
+        return DeepgramTranscriptionResult(
+            text=" ".join(result.text for result in results if result.text),
+            language=languages.most_common(1)[0][0] if languages else None,
+        )
+
+    async def _transcribe_buffer(
+        self,
+        buffer_data: bytes,
+        mimetype: Optional[str],
+        language: Optional[DeepgramLanguageEnum] = None,
+    ) -> DeepgramTranscriptionResult:
+        """Transcribe encoded audio held in memory"""
+        try:
             # Prepare the file source
             payload: FileSource = {
                 "buffer": buffer_data,
-                "mimetype": audio_file.content_type,
+                "mimetype": mimetype,
             }
 
             # Configure Deepgram options
@@ -99,10 +154,27 @@ class DeepgramSTTClient(BaseSTTClient):
             # Log at debug level
             logger.debug(f"Deepgram transcription options: {options}")
 
-            # Call Deepgram API with timeout from settings
-            response = self.client.listen.rest.v("1").transcribe_file(
-                payload, options, timeout=settings.STT_TIMEOUT
-            )
+            # Call Deepgram API with timeout from settings. The async client
+            # keeps the event loop free while the upload is transcribed
+            for attempt in range(settings.STT_MAX_RETRIES + 1):
+                try:
+                    async with _stt_semaphore:
+                        response = await self.client.listen.asyncrest.v(
+                            "1"
+                        ).transcribe_file(payload, options, timeout=settings.STT_TIMEOUT)
+                    break
+                except Exception as e:
+                    if attempt == settings.STT_MAX_RETRIES or not _is_transient(e):
+                        raise
+                    # Full jitter keeps chunks that failed together from
+                    # retrying together
+                    delay = random.uniform(
+                        0, min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2**attempt)
+                    )
+                    logger.warning(
+                        f"Transient Deepgram error, retrying in {delay:.2f}s: {str(e)}"
+                    )
+                    await asyncio.sleep(delay)
             # Extract results from response
             results = response.results
 
@@ -141,8 +213,3 @@ class DeepgramSTTClient(BaseSTTClient):
         except Exception as e:
             logger.error(f"Error in Deepgram transcription: {str(e)}")
             raise e
-
-        finally:
-            # Clean up the temporary file
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
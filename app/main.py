@@ -1,6 +1,10 @@
 # app/main.py
 import asyncio
 import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -13,7 +17,13 @@ from app.core.error_handlers import register_exception_handlers
 from app.core.middleware import register_middlewares, ProxyHeadersMiddleware
 from app.db.base import SessionLocal
 from app.services.subscription_service import SubscriptionService
+from app.services.note_service import NoteService
+from app.services.google_calendar_service import (
+    GoogleCalendarService,
+    TOKEN_REFRESH_INTERVAL_SECONDS,
+)
 from app.services import register_services
+from app.integrations.chat_completion import close_clients as close_llm_clients
 
 # Set up the logger at the start
 logger = setup_logging()
@@ -54,6 +64,49 @@ async def check_expired_subscriptions():
             await asyncio.sleep(60)
 
 
+def refresh_expiring_google_tokens_once() -> int:
+    db = SessionLocal()
+    try:
+        return GoogleCalendarService(db).refresh_expiring_tokens()
+    finally:
+        db.close()
+
+
+# Background task for refreshing Google tokens before they expire
+async def refresh_expiring_google_tokens():
+    while True:
+        try:
+            # Token refreshes are blocking HTTPS calls, so run them in a thread
+            refreshed_count = await asyncio.to_thread(
+                refresh_expiring_google_tokens_once
+            )
+            if refreshed_count > 0:
+                logger.info(f"Refreshed {refreshed_count} expiring Google tokens")
+
+            await asyncio.sleep(TOKEN_REFRESH_INTERVAL_SECONDS)
+        except Exception as e:
+            logger.error(f"Error in token refresh task: {str(e)}", exc_info=True)
+            await asyncio.sleep(60)
+
+
+# Background task for failing voice notes whose processing was lost
+async def fail_stale_voice_notes():
+    while True:
+        try:
+            db = SessionLocal()
+            try:
+                failed_count = await NoteService(db).fail_stale_voice_notes()
+                if failed_count > 0:
+                    logger.info(f"Failed {failed_count} interrupted voice notes")
+            finally:
+                db.close()
+
+            await asyncio.sleep(settings.VOICE_NOTE_RECOVERY_INTERVAL)
+        except Exception as e:
+            logger.error(f"Error in voice note recovery task: {str(e)}", exc_info=True)
+            await asyncio.sleep(60)
+
+
 # Context manager for startup/shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -65,18 +118,26 @@ async def lifespan(app: FastAPI):
     logger.info("Services registered")
 
     # Start background tasks on startup
-    background_task = asyncio.create_task(check_expired_subscriptions())
+    background_tasks = [
+        asyncio.create_task(check_expired_subscriptions()),
+        asyncio.create_task(refresh_expiring_google_tokens()),
+        asyncio.create_task(fail_stale_voice_notes()),
+    ]
 
     yield
 
     # Cancel background tasks on shutdown
     logger.info("Shutting down application and background tasks")
-    background_task.cancel()
+    for background_task in background_tasks:
+        background_task.cancel()
     try:
-        await background_task
+        await asyncio.gather(*background_tasks)
     except asyncio.CancelledError:
         logger.info("Background tasks cancelled successfully")
 
+    # Close the shared LLM connection pools
+    await close_llm_clients()
+
 
 app = FastAPI(
     title="Quest Logger API",
@@ -109,6 +170,30 @@ if settings.BACKEND_CORS_ORIGINS:
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# OpenAPI schema generated at build time by scripts/freeze_openapi.py
+FROZEN_OPENAPI_PATH = Path(__file__).parent / "static" / "openapi.json"
+
+
+def load_frozen_openapi() -> Optional[Dict[str, Any]]:
+    """Load the build-time OpenAPI schema if it matches the running API prefix"""
+    if not FROZEN_OPENAPI_PATH.exists():
+        return None
+
+    schema = orjson.loads(FROZEN_OPENAPI_PATH.read_bytes())
+    paths = schema.get("paths", {})
+    if any(path != "/" and not path.startswith(settings.API_V1_STR) for path in paths):
+        logger.warning(
+            "Frozen OpenAPI schema was built for a different API prefix, "
+            "generating it at runtime instead"
+        )
+        return None
+    return schema
+
+
+_frozen_openapi = load_frozen_openapi()
+if _frozen_openapi is not None:
+    app.openapi = lambda: _frozen_openapi
+
 
 @app.get("/")
 def root():
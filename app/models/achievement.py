@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, Boolean
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, Boolean
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -21,7 +21,7 @@ class AchievementCriterion(Base):
     __tablename__ = "achievement_criteria"
 
     id = Column(Integer, primary_key=True, index=True)
-    achievement_id = Column(Integer, ForeignKey("achievements.id"))
+    achievement_id = Column(Integer, ForeignKey("achievements.id"), index=True)
     criterion_type = Column(String, nullable=False)  # e.g., 'quests_completed', 'level'
     target_value = Column(Integer, nullable=False)
 
@@ -43,6 +43,9 @@ class UserAchievementProgress(Base):
 
 class UserAchievement(Base):
     __tablename__ = "user_achievements"
+    __table_args__ = (
+        Index("ix_user_achievements_user_id_achievement_id", "user_id", "achievement_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -1,6 +1,8 @@
 # app/repositories/quest_repository.py
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, selectinload
 from datetime import datetime
 
 from app.repositories.base_repository import BaseRepository
@@ -26,7 +28,19 @@ class AchievementRepository(BaseRepository[models.Achievement]):
         """Get all achievements with their criteria."""
         return (
             self.db.query(models.Achievement)
-            .options(joinedload(models.Achievement.criteria))
+            .options(selectinload(models.Achievement.criteria))
+            .all()
+        )
+
+    def get_by_ids(self, achievement_ids: Iterable[int]) -> List[models.Achievement]:
+        """Get achievements by ID with their criteria."""
+        achievement_ids = list(achievement_ids)
+        if not achievement_ids:
+            return []
+        return (
+            self.db.query(models.Achievement)
+            .options(selectinload(models.Achievement.criteria))
+            .filter(models.Achievement.id.in_(achievement_ids))
             .all()
         )
 
@@ -40,6 +54,18 @@ class AchievementRepository(BaseRepository[models.Achievement]):
             .all()
         )
 
+    def get_all_criteria(self) -> List[Tuple[int, int, str, int]]:
+        """Get (id, achievement_id, criterion_type, target_value) for every criterion."""
+        return (
+            self.db.query(
+                models.AchievementCriterion.id,
+                models.AchievementCriterion.achievement_id,
+                models.AchievementCriterion.criterion_type,
+                models.AchievementCriterion.target_value,
+            )
+            .all()
+        )
+
     def get_user_achievements(self, user_id: int) -> List[models.UserAchievement]:
         """Get all achievements unlocked by a user."""
         return (
@@ -81,11 +107,27 @@ class AchievementRepository(BaseRepository[models.Achievement]):
         """Get all progress records for a user."""
         return (
             self.db.query(models.UserAchievementProgress)
-            .options(joinedload(models.UserAchievementProgress.criterion))
             .filter(models.UserAchievementProgress.user_id == user_id)
             .all()
         )
 
+    def get_user_progress_map(
+        self, user_id: int, criterion_ids: Iterable[int]
+    ) -> Dict[int, models.UserAchievementProgress]:
+        """Get a user's progress records for several criteria, keyed by criterion ID."""
+        criterion_ids = list(criterion_ids)
+        if not criterion_ids:
+            return {}
+        records = (
+            self.db.query(models.UserAchievementProgress)
+            .filter(
+                models.UserAchievementProgress.user_id == user_id,
+                models.UserAchievementProgress.criterion_id.in_(criterion_ids),
+            )
+            .all()
+        )
+        return {record.criterion_id: record for record in records}
+
     def create_or_update_progress(
         self, user_id: int, criterion_id: int, progress_value: int
     ) -> models.UserAchievementProgress:
@@ -108,10 +150,133 @@ class AchievementRepository(BaseRepository[models.Achievement]):
         self.db.refresh(progress)
         return progress
 
+    def upsert_progress(
+        self, user_id: int, progress_by_criterion: Dict[int, int]
+    ) -> None:
+        """
+        Create or update several progress records in a single statement.
+        Flushes only; the caller commits.
+        """
+        if not progress_by_criterion:
+            return
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "criterion_id": criterion_id,
+                "progress": progress_value,
+                "last_updated": now,
+            }
+            for criterion_id, progress_value in progress_by_criterion.items()
+        ]
+
+        insert = self._insert()
+        if insert is None:
+            for row in rows:
+                self.db.merge(models.UserAchievementProgress(**row))
+            self.db.flush()
+            return
+
+        stmt = insert(models.UserAchievementProgress).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "criterion_id"],
+            set_={
+                "progress": stmt.excluded.progress,
+                "last_updated": stmt.excluded.last_updated,
+            },
+        )
+        self.db.execute(stmt)
+        self._expire_progress(user_id, progress_by_criterion)
+
+    def increment_progress(
+        self, user_id: int, increments: Dict[int, Tuple[int, int]]
+    ) -> None:
+        """
+        Add to several progress records in a single statement, capping each at
+        its target. increments maps criterion ID to (amount, target_value).
+        The addition happens in the database, so concurrent increments are
+        not lost. Flushes only; the caller commits.
+        """
+        if not increments:
+            return
+
+        now = datetime.utcnow()
+        insert = self._insert()
+        if insert is None:
+            for criterion_id, (amount, target_value) in increments.items():
+                progress = self.get_user_progress(user_id, criterion_id)
+                current = progress.progress if progress else 0
+                self.db.merge(
+                    models.UserAchievementProgress(
+                        user_id=user_id,
+                        criterion_id=criterion_id,
+                        progress=min(current + amount, target_value),
+                        last_updated=now,
+                    )
+                )
+            self.db.flush()
+            return
+
+        # A new row starts at the capped amount; an existing one adds the
+        # amount and is capped at its criterion's target
+        stmt = insert(models.UserAchievementProgress).values(
+            [
+                {
+                    "user_id": user_id,
+                    "criterion_id": criterion_id,
+                    "progress": min(amount, target_value),
+                    "last_updated": now,
+                }
+                for criterion_id, (amount, target_value) in increments.items()
+            ]
+        )
+        target_value = case(
+            {
+                criterion_id: target_value
+                for criterion_id, (_, target_value) in increments.items()
+            },
+            value=stmt.excluded.criterion_id,
+        )
+        # least() is spelled as the two-argument min() in SQLite
+        least = func.least if self.db.get_bind().dialect.name == "postgresql" else func.min
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "criterion_id"],
+            set_={
+                "progress": least(
+                    models.UserAchievementProgress.progress + stmt.excluded.progress,
+                    target_value,
+                ),
+                "last_updated": stmt.excluded.last_updated,
+            },
+        )
+        self.db.execute(stmt)
+        self._expire_progress(user_id, increments)
+
+    def _insert(self):
+        """The dialect's INSERT supporting ON CONFLICT, if there is one."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert
+        if dialect == "sqlite":
+            return sqlite.insert
+        return None
+
+    def _expire_progress(self, user_id: int, criterion_ids: Iterable[int]) -> None:
+        """Loaded progress rows are stale after a bulk statement."""
+        for criterion_id in criterion_ids:
+            progress = self.db.identity_map.get(
+                self.db.identity_key(
+                    models.UserAchievementProgress, (user_id, criterion_id)
+                )
+            )
+            if progress is not None:
+                self.db.expire(progress)
+
     def create_user_achievement(
         self, user_id: int, achievement_id: int
     ) -> models.UserAchievement:
-        """Create user achievement record."""
+        """Create user achievement record. Flushes only; the caller commits."""
         user_achievement = models.UserAchievement(
             user_id=user_id,
             achievement_id=achievement_id,
@@ -119,17 +284,18 @@ class AchievementRepository(BaseRepository[models.Achievement]):
             times_earned=1,
         )
         self.db.add(user_achievement)
-        self.db.commit()
-        self.db.refresh(user_achievement)
+        self.db.flush()
         return user_achievement
 
     def increment_user_achievement(
         self, user_achievement: models.UserAchievement
     ) -> models.UserAchievement:
-        """Increment times earned for repeatable achievements."""
+        """
+        Increment times earned for repeatable achievements.
+        Flushes only; the caller commits.
+        """
         user_achievement.times_earned += 1
         user_achievement.unlocked_at = datetime.utcnow()
         self.db.add(user_achievement)
-        self.db.commit()
-        self.db.refresh(user_achievement)
+        self.db.flush()
         return user_achievement
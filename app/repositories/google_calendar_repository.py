@@ -1,9 +1,14 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import text, update
 from sqlalchemy.orm import Session
 
 from app.repositories.base_repository import BaseRepository
 from app.models.google_calendar import GoogleCalendarIntegration
 
+# Longest a request waits for another transaction's lock on an integration row
+ROW_LOCK_TIMEOUT_MS = 5000
+
 
 class GoogleCalendarRepository(BaseRepository[GoogleCalendarIntegration]):
     """Repository for Google Calendar integrations."""
@@ -11,14 +16,19 @@ class GoogleCalendarRepository(BaseRepository[GoogleCalendarIntegration]):
     def __init__(self, db: Session):
         super().__init__(GoogleCalendarIntegration, db)
 
+    def save(self, obj: GoogleCalendarIntegration) -> GoogleCalendarIntegration:
+        """
+        Stage an integration without committing. The service commits once per
+        operation, so a change costs one flush instead of a commit plus a reload.
+        """
+        self.db.add(obj)
+        self.db.flush()
+        return obj
+
     def get_by_user_id(self, user_id: int) -> Optional[GoogleCalendarIntegration]:
         """Get Google Calendar integration for a specific user."""
         return self.get_by(user_id=user_id)
 
-    def get_by_oauth_state(self, state: str) -> Optional[GoogleCalendarIntegration]:
-        """Get integration by OAuth state token."""
-        return self.get_by(oauth_state=state)
-
     def get_active_by_user_id(
         self, user_id: int
     ) -> Optional[GoogleCalendarIntegration]:
@@ -32,6 +42,61 @@ class GoogleCalendarRepository(BaseRepository[GoogleCalendarIntegration]):
             .first()
         )
 
+    def consume_oauth_state(self, integration_id: int, state_digest: str) -> bool:
+        """
+        Clear the integration's pending OAuth state if it matches, in a single
+        conditional UPDATE, so only one request can complete a given flow.
+        Does not commit.
+        """
+        result = self.db.execute(
+            update(GoogleCalendarIntegration)
+            .where(
+                GoogleCalendarIntegration.id == integration_id,
+                GoogleCalendarIntegration.oauth_state == state_digest,
+            )
+            .values(oauth_state=None)
+        )
+        return result.rowcount == 1
+
+    def lock(
+        self, integration: GoogleCalendarIntegration, skip_locked: bool = False
+    ) -> Optional[GoogleCalendarIntegration]:
+        """
+        Lock the integration's row until the transaction ends and reload it, so
+        the caller sees any change made by whoever held the lock before.
+        Waits at most ROW_LOCK_TIMEOUT_MS on PostgreSQL; with skip_locked,
+        returns None at once if another transaction holds the row.
+        """
+        if not skip_locked and self.db.get_bind().dialect.name == "postgresql":
+            # Scoped to the current transaction, which the caller ends soon after
+            self.db.execute(text(f"SET LOCAL lock_timeout = {ROW_LOCK_TIMEOUT_MS}"))
+        return (
+            self.db.query(GoogleCalendarIntegration)
+            .filter(GoogleCalendarIntegration.id == integration.id)
+            .with_for_update(skip_locked=skip_locked)
+            .populate_existing()
+            .one_or_none()
+        )
+
+    def get_active_expiring_between(
+        self, start: datetime, end: datetime
+    ) -> List[GoogleCalendarIntegration]:
+        """
+        Get refreshable active integrations whose token expires in [start, end),
+        ordered by id so concurrent jobs take row locks in the same order.
+        """
+        return (
+            self.db.query(GoogleCalendarIntegration)
+            .filter(
+                GoogleCalendarIntegration.is_active == True,
+                GoogleCalendarIntegration.refresh_token.isnot(None),
+                GoogleCalendarIntegration.token_expiry >= start,
+                GoogleCalendarIntegration.token_expiry < end,
+            )
+            .order_by(GoogleCalendarIntegration.id)
+            .all()
+        )
+
     def update_selected_calendar(
         self, integration_id: int, calendar_id: str, calendar_name: str
     ) -> Optional[GoogleCalendarIntegration]:
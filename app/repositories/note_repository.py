@@ -1,9 +1,9 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import uuid4
 from datetime import datetime
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import case, desc, func, select, update
 
 from app.repositories.base_repository import BaseRepository
 from app.models import Note
@@ -40,15 +40,18 @@ class NoteRepository(BaseRepository[Note]):
         owner_id: int,
         obj_in: VoiceNoteCreate,
         audio_duration_minutes: float,
+        audio_url: Optional[str] = None,
     ) -> Note:
-        """Create a voice note with audio information but without storing the audio file"""
+        """Create a voice note that is waiting for its audio to be processed"""
         note = Note(
             owner_id=owner_id,
             title="Note is being processed",
             audio_duration=audio_duration_minutes,
+            audio_url=audio_url,
             folder=obj_in.folder,
             note_style=obj_in.note_style,
             tags=obj_in.tags,
+            processing_status=NoteProcessingStatus.PROCESSING,
         )
         self.db.add(note)
         self.db.commit()
@@ -80,6 +83,45 @@ class NoteRepository(BaseRepository[Note]):
             .first()
         )
 
+    def get_stale_processing(self, updated_before: datetime) -> List[Note]:
+        """Get notes still processing that were last updated before the given time"""
+        return (
+            self.db.query(Note)
+            .filter(
+                Note.processing_status == NoteProcessingStatus.PROCESSING,
+                Note.updated_at < updated_before,
+            )
+            .all()
+        )
+
+    def mark_processing_failed(self, note_id: int, error: str) -> Optional[Note]:
+        """
+        Move a note from processing to error and return it reloaded, or None if
+        it already left processing. A conditional UPDATE, so only one caller
+        claims each note; the row stays locked until the caller commits.
+        Does not commit.
+        """
+        claimed = self.db.execute(
+            update(Note)
+            .where(
+                Note.id == note_id,
+                Note.processing_status == NoteProcessingStatus.PROCESSING,
+            )
+            .values(
+                processing_status=NoteProcessingStatus.ERROR,
+                processing_error=error[:255],  # Limit error message length
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed != 1:
+            return None
+        return (
+            self.db.query(Note)
+            .filter(Note.id == note_id)
+            .populate_existing()
+            .one()
+        )
+
     def get_by_share_id(self, share_id: str) -> Optional[Note]:
         """Get a note by public share ID"""
         return (
@@ -162,14 +204,58 @@ class NoteRepository(BaseRepository[Note]):
         self.db.commit()
         return True
 
-    def generate_share_link(self, note: Note) -> Note:
-        """Generate a public shareable link for a note"""
-        note.is_public = True
-        note.public_share_id = str(uuid4())
-        self.db.add(note)
+    def generate_share_link(
+        self, owner_id: int, note_id: int
+    ) -> Optional[Tuple[str, bool]]:
+        """
+        Share a user's note, keeping its share ID if it already has one.
+        Returns (share_id, already_shared), or None if the note isn't theirs.
+        A single conditional UPDATE, so concurrent requests agree on the ID.
+        """
+        new_share_id = str(uuid4())
+        share_id = self.db.execute(
+            update(Note)
+            .where(Note.id == note_id, Note.owner_id == owner_id)
+            .values(
+                public_share_id=func.coalesce(Note.public_share_id, new_share_id),
+                is_public=True,
+                # Only a newly shared note counts as updated
+                updated_at=case(
+                    (Note.public_share_id.is_(None), datetime.utcnow()),
+                    else_=Note.updated_at,
+                ),
+            )
+            .returning(Note.public_share_id)
+        ).scalar()
+        if share_id is None:
+            self.db.rollback()
+            return None
         self.db.commit()
-        self.db.refresh(note)
-        return note
+        return share_id, share_id != new_share_id
+
+    def remove_share_link(self, owner_id: int, note_id: int) -> Optional[bool]:
+        """
+        Stop sharing a user's note. Returns whether it was shared, or None if
+        the note isn't theirs.
+        """
+        result = self.db.execute(
+            update(Note)
+            .where(
+                Note.id == note_id,
+                Note.owner_id == owner_id,
+                Note.public_share_id.is_not(None),
+            )
+            .values(public_share_id=None)
+        )
+        self.db.commit()
+        if result.rowcount:
+            return True
+
+        # Nothing changed: the note is either already unshared or not theirs
+        exists = self.db.execute(
+            select(Note.id).where(Note.id == note_id, Note.owner_id == owner_id)
+        ).first()
+        return False if exists else None
 
     def disable_share_link(self, note: Note) -> Note:
         """Disable public sharing for a note"""
@@ -1,5 +1,6 @@
 # app/repositories/user_repository.py
 from typing import Optional
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app import models, schemas
@@ -25,6 +26,30 @@ class UserRepository:
         self.db.refresh(user)
         return user
 
+    def add_experience(self, user_id: int, exp_amount: int) -> Optional[int]:
+        """
+        Atomically add experience to a user and return the new total.
+        Does not commit; the caller owns the transaction.
+        """
+        return self.db.execute(
+            update(models.User)
+            .where(models.User.id == user_id)
+            .values(experience=models.User.experience + exp_amount)
+            .returning(models.User.experience)
+        ).scalar()
+
+    def raise_level(self, user_id: int, level: int) -> bool:
+        """
+        Atomically raise a user's level; returns False if it was already reached.
+        Does not commit; the caller owns the transaction.
+        """
+        result = self.db.execute(
+            update(models.User)
+            .where(models.User.id == user_id, models.User.level < level)
+            .values(level=level)
+        )
+        return result.rowcount > 0
+
     def update_me(
         self, user: models.User, update_data: schemas.UserUpdate
     ) -> models.User:
@@ -0,0 +1,27 @@
+# app/schemas/common.py
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+# Response for share link operations
+class ShareLinkResponse(BaseModel):
+    share_id: Optional[str] = None
+    share_url: Optional[str] = None
+    already_shared: bool = False
+
+
+# Response for unshare operations
+class UnshareResponse(BaseModel):
+    success: bool
+    already_unshared: bool = False
+
+
+# Response for folders list
+class FolderListResponse(BaseModel):
+    folders: List[str]
+
+
+# Response for tags list
+class TagListResponse(BaseModel):
+    tags: List[str]
@@ -1,13 +1,22 @@
-import enum
 from datetime import datetime
-from typing import Optional, List
+from typing import TYPE_CHECKING, Literal, Optional, List
 
-from fastapi import UploadFile
 from pydantic import BaseModel
 from app.models.note import NoteStyle
-from app.integrations.speech.deepgram_stt_client import DeepgramLanguageEnum
+from app.schemas.common import (
+    ShareLinkResponse,
+    UnshareResponse,
+    FolderListResponse,
+    TagListResponse,
+)
 from enum import StrEnum
 
+# Voice-only dependencies are imported lazily so importing a note schema does
+# not pull in Starlette's upload handling or the Deepgram client.
+if TYPE_CHECKING:
+    from fastapi import UploadFile
+    from app.integrations.speech.deepgram_stt_client import DeepgramLanguageEnum
+
 class NoteLanguage(StrEnum):
     EN = "en"
     DE = "de"
@@ -23,13 +32,21 @@ class NoteProcessingStatus(StrEnum):
     ERROR = "error"
 
 
+# Literal aliases of the enums above, used for schema fields. Literal unions
+# validate as a plain set-membership check instead of building enum instances.
+NoteStyleLiteral = Literal[tuple(style.value for style in NoteStyle)]
+NoteLanguageLiteral = Literal[tuple(language.value for language in NoteLanguage)]
+NoteProcessingStatusLiteral = Literal[
+    tuple(status.value for status in NoteProcessingStatus)
+]
+
 # Base Schema
 class NoteBase(BaseModel):
     title: str
     content: Optional[str] = None
     tags: Optional[str] = None
     folder: Optional[str] = None
-    note_style: NoteStyle = NoteStyle.STANDARD
+    note_style: NoteStyleLiteral = "standard"
     quest_id: Optional[int] = None
 
 
@@ -48,41 +65,56 @@ class NoteUpdate(BaseModel):
     content: Optional[str] = None
     tags: Optional[str] = None
     folder: Optional[str] = None
-    note_style: Optional[NoteStyle] = None
+    note_style: Optional[NoteStyleLiteral] = None
     is_public: Optional[bool] = None
     quest_id: Optional[int] = None
     ai_processed: Optional[bool] = None
 
 
-# DB Schema for response
-class Note(NoteBase):
-    id: int
-    owner_id: int
-    created_at: datetime
-    updated_at: datetime
-    is_public: bool
-    audio_duration: Optional[float] = None
-    language: Optional[NoteLanguage] = None
+# AI processing information for a stored note
+class NoteAIInfo(BaseModel):
     ai_processed: bool
     ai_summary: Optional[str] = None
     extracted_action_items: Optional[str] = None
-    public_share_id: Optional[str] = None
-    processing_status: Optional[NoteProcessingStatus] = None
+    processing_status: Optional[NoteProcessingStatusLiteral] = None
     processing_error: Optional[str] = None
 
+
+# Audio information for a stored voice note
+class NoteAudioInfo(BaseModel):
+    audio_duration: Optional[float] = None
+    language: Optional[NoteLanguageLiteral] = None
+
+
+# Public sharing information for a stored note
+class NoteSharingInfo(BaseModel):
+    is_public: bool
+    public_share_id: Optional[str] = None
+
+
+# DB Schema for response, composed from the groups above so the
+# response stays flat
+class Note(NoteBase, NoteSharingInfo, NoteAudioInfo, NoteAIInfo):
+    id: int
+    owner_id: int
+    created_at: datetime
+    updated_at: datetime
+
     class Config:
         from_attributes = True
 
 
 # Voice Note Schema
 class VoiceNoteCreate(BaseModel):
-    audio_file: UploadFile
+    audio_file: "UploadFile"
     folder: Optional[str] = None
     tags: Optional[str] = None
-    note_style: NoteStyle = NoteStyle.STANDARD
-    language: Optional[NoteLanguage] = None
+    note_style: NoteStyleLiteral = "standard"
+    language: Optional[NoteLanguageLiteral] = None
+
+    def map_to_deepgram_language(self, language: NoteLanguageLiteral) -> Optional["DeepgramLanguageEnum"]:
+        from app.integrations.speech.deepgram_stt_client import DeepgramLanguageEnum
 
-    def map_to_deepgram_language(self, language: NoteLanguage) -> Optional[DeepgramLanguageEnum]:
         try: 
             return DeepgramLanguageEnum(language)
         except ValueError:
@@ -93,9 +125,20 @@ class ProcessedVoiceNoteCreate(VoiceNoteCreate):
     content: str
     raw_transcript: str
     ai_processed: bool
-    processing_status: Optional[NoteProcessingStatus] = None
-    language: Optional[NoteLanguage] = None
+    processing_status: Optional[NoteProcessingStatusLiteral] = None
+    language: Optional[NoteLanguageLiteral] = None
     audio_duration: float
+
+
+def rebuild_voice_note_models() -> None:
+    """Resolve the lazily imported UploadFile annotation on the voice note schemas"""
+    from fastapi import UploadFile
+
+    for model in (VoiceNoteCreate, ProcessedVoiceNoteCreate):
+        if not model.__pydantic_complete__:
+            model.model_rebuild(_types_namespace={"UploadFile": UploadFile})
+
+
 # Voice Note Processing Result
 class VoiceNoteResult(BaseModel):
     id: int
@@ -103,7 +146,7 @@ class VoiceNoteResult(BaseModel):
     content: Optional[str] = None
     raw_transcript: Optional[str] = None
     audio_duration: float
-    language: NoteLanguage
+    language: NoteLanguageLiteral
     ai_processed: bool
     ai_summary: Optional[str] = None
 
@@ -131,36 +174,6 @@ class NoteList(BaseModel):
     pages: int
 
 
-# Response for share link operations
-class ShareLinkResponse(BaseModel):
-    share_id: Optional[str] = None
-    share_url: Optional[str] = None
-    already_shared: bool = False
-
-
-# Response for unshare operations
-class UnshareResponse(BaseModel):
-    success: bool
-    already_unshared: bool = False
-
-
-# Response for folders list
-class FolderListResponse(BaseModel):
-    folders: List[str]
-
-
-# Response for tags list
-class TagListResponse(BaseModel):
-    tags: List[str]
-
-
-# Response for export operations
-class ExportResponse(BaseModel):
-    content: bytes
-    content_type: str
-    filename: str
-
-
 # Response for audio processing
 class AudioProcessingResponse(BaseModel):
     success: bool
@@ -1,24 +1,33 @@
 # app/schemas/quest.py
 from datetime import datetime, timezone
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
 
 from app.models.quest import QuestRarity, QuestType
 
+# Literal aliases of the ORM enums; cheaper to validate than enum fields
+QuestRarityLiteral = Literal[tuple(rarity.value for rarity in QuestRarity)]
+QuestTypeLiteral = Literal[tuple(quest_type.value for quest_type in QuestType)]
+
+
+def _end_of_today_utc() -> datetime:
+    """Default due date: the end of the current day in UTC"""
+    return datetime.now(timezone.utc).replace(
+        hour=23, minute=59, second=59, microsecond=0
+    )
+
 
 # Shared properties
 class QuestBase(BaseModel):
     title: str
     description: Optional[str] = None
-    rarity: QuestRarity = QuestRarity.COMMON
-    quest_type: QuestType = QuestType.REGULAR
+    rarity: QuestRarityLiteral = "common"
+    quest_type: QuestTypeLiteral = "regular"
     priority: int = 1
     exp_reward: int = 10
     parent_quest_id: Optional[int] = None
     tracked: bool = True
-    due_date: Optional[datetime] = datetime.now(timezone.utc).replace(
-        hour=23, minute=59, second=59
-    )
+    due_date: Optional[datetime] = Field(default_factory=_end_of_today_utc)
 
 
 # Properties to receive on quest creation
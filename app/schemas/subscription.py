@@ -1,12 +1,20 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel
+
+from app.models.subscription import BillingCycle, SubscriptionStatus as SubscriptionStatusEnum
+
+# Literal aliases of the status/billing constants, validated as a set lookup
+SubscriptionStatusLiteral = Literal[
+    tuple(status.value for status in SubscriptionStatusEnum)
+]
+BillingCycleLiteral = Literal[tuple(cycle.value for cycle in BillingCycle)]
 
 
 # Base Schema
 class SubscriptionBase(BaseModel):
-    billing_cycle: Optional[str] = "monthly"  # "monthly" or "annual"
+    billing_cycle: Optional[BillingCycleLiteral] = "monthly"
     promotional_code: Optional[str] = None
 
 
@@ -16,7 +24,7 @@ class Subscription(SubscriptionBase):
     user_id: int
     stripe_subscription_id: Optional[str] = None
     stripe_customer_id: Optional[str] = None
-    status: Optional[str] = "active"
+    status: Optional[SubscriptionStatusLiteral] = "active"
     current_period_start: Optional[datetime] = None
     current_period_end: Optional[datetime] = None
     trial_end: Optional[datetime] = None
@@ -41,8 +49,8 @@ class SubscriptionCreate(SubscriptionBase):
 
 # Update Schema
 class SubscriptionUpdate(BaseModel):
-    status: Optional[str] = None
-    billing_cycle: Optional[str] = None
+    status: Optional[SubscriptionStatusLiteral] = None
+    billing_cycle: Optional[BillingCycleLiteral] = None
     stripe_subscription_id: Optional[str] = None
     stripe_customer_id: Optional[str] = None
     current_period_start: Optional[datetime] = None
@@ -54,8 +62,8 @@ class SubscriptionUpdate(BaseModel):
 
 # User-facing subscription status
 class SubscriptionStatus(BaseModel):
-    status: str
-    billing_cycle: str
+    status: SubscriptionStatusLiteral
+    billing_cycle: BillingCycleLiteral
     current_period_end: Optional[datetime] = None
     trial_end: Optional[datetime] = None
     minutes_used: float
@@ -73,19 +81,6 @@ class PricingInfo(BaseModel):
     promotional_codes: List[dict]
 
 
-# Schema for share link responses
-class ShareLinkResponse(BaseModel):
-    share_id: Optional[str]
-    share_url: Optional[str]
-    already_shared: bool = False
-
-
-# Schema for unshare responses
-class UnshareResponse(BaseModel):
-    success: bool
-    already_unshared: bool = False
-
-
 # Schema for payment method response
 class PaymentMethodResponse(BaseModel):
     id: int
@@ -106,18 +101,3 @@ class CheckoutSessionResponse(BaseModel):
 class WebhookResponse(BaseModel):
     status: str
     event_type: str
-
-
-# Response for folders and tags
-class FolderListResponse(BaseModel):
-    folders: List[str]
-
-
-class TagListResponse(BaseModel):
-    tags: List[str]
-
-
-class ExportResponse(BaseModel):
-    content: bytes
-    content_type: str
-    filename: str
@@ -1,9 +1,14 @@
 from datetime import datetime, date
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from typing import Literal, Optional
+from pydantic import BaseModel, Field, computed_field
 
 from app.models.time_tracking import TimeEntryPaymentStatus
 
+# Literal alias of the ORM enum; cheaper to validate than an enum field
+TimeEntryPaymentStatusLiteral = Literal[
+    tuple(payment_status.value for payment_status in TimeEntryPaymentStatus)
+]
+
 
 # Base schemas
 class TimeEntryBase(BaseModel):
@@ -11,7 +16,7 @@ class TimeEntryBase(BaseModel):
     start_time: datetime
     end_time: Optional[datetime] = None
     hourly_rate: float
-    payment_status: TimeEntryPaymentStatus = TimeEntryPaymentStatus.NOT_PAID
+    payment_status: TimeEntryPaymentStatusLiteral = "not_paid"
     notes: Optional[str] = None
 
 
@@ -30,7 +35,7 @@ class TimeEntryUpdate(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     hourly_rate: Optional[float] = None
-    payment_status: Optional[TimeEntryPaymentStatus] = None
+    payment_status: Optional[TimeEntryPaymentStatusLiteral] = None
     notes: Optional[str] = None
 
 
@@ -38,14 +43,25 @@ class TimeEntryUpdate(BaseModel):
 class TimeEntry(TimeEntryBase):
     id: int
     user_id: int
-    total_hours: Optional[float] = None
-    total_earned: Optional[float] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+    # Derived on dump; plain properties (not cached) since entries are mutable
+    @computed_field
+    @property
+    def total_hours(self) -> float:
+        if not self.end_time:
+            return 0.0
+        return round((self.end_time - self.start_time).total_seconds() / 3600, 2)
+
+    @computed_field
+    @property
+    def total_earned(self) -> float:
+        return self.total_hours * self.hourly_rate
+
 
 # Settings schemas
 class TimeTrackingSettingsBase(BaseModel):
@@ -93,7 +109,7 @@ class TimeEntryList(BaseModel):
 class GenerateInvoiceLinkRequest(BaseModel):
     start_date: Optional[date] = None
     end_date: Optional[date] = None
-    payment_status: Optional[TimeEntryPaymentStatus] = None
+    payment_status: Optional[TimeEntryPaymentStatusLiteral] = None
     expires_in_days: int = Field(default=30, ge=1, le=365)
 
 
@@ -104,7 +120,7 @@ class GenerateInvoiceLinkResponse(BaseModel):
 # Batch update schemas
 class BatchUpdatePaymentStatusRequest(BaseModel):
     entry_ids: list[int] = Field(..., min_items=1, description="List of time entry IDs to update")
-    payment_status: TimeEntryPaymentStatus = Field(..., description="New payment status to set")
+    payment_status: TimeEntryPaymentStatusLiteral = Field(..., description="New payment status to set")
 
 
 class BatchUpdatePaymentStatusResponse(BaseModel):
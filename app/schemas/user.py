@@ -1,5 +1,5 @@
 # app/schemas/user.py
-from typing import List, Optional
+from typing import Optional
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -1,11 +1,36 @@
 # app/repositories/achievement_repository.py
-from typing import List, Optional
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 
 from app import models
 from app.repositories.achievement_repository import AchievementRepository
 
 
+class CachedCriterion(NamedTuple):
+    id: int
+    achievement_id: int
+    criterion_type: str
+    target_value: int
+
+
+# Criteria are seeded configuration, so they are loaded per process and
+# grouped by type, along with the achievements each type can unlock. They are
+# reloaded after _CRITERIA_CACHE_TTL seconds so criteria seeded by another
+# process show up; call invalidate_criteria_cache() to see changes sooner.
+_CRITERIA_CACHE_TTL = 300
+_CRITERIA_BY_TYPE: Optional[Dict[str, List[CachedCriterion]]] = None
+_ACHIEVEMENTS_BY_CRITERION_TYPE: Optional[Dict[str, Set[int]]] = None
+_CRITERIA_LOADED_AT = 0.0
+
+
+def invalidate_criteria_cache() -> None:
+    """Drop the cached criteria so the next lookup reloads them."""
+    global _CRITERIA_BY_TYPE, _ACHIEVEMENTS_BY_CRITERION_TYPE
+    _CRITERIA_BY_TYPE = None
+    _ACHIEVEMENTS_BY_CRITERION_TYPE = None
+
+
 class AchievementService:
     def __init__(self, db: Session):
         self.db = db
@@ -19,11 +44,48 @@ class AchievementService:
         """Get achievement by ID."""
         return self.repository.get_by_id(achievement_id)
 
-    def get_criteria_by_type(
-        self, criterion_type: str
-    ) -> List[models.AchievementCriterion]:
+    def get_by_ids(self, achievement_ids: Iterable[int]) -> List[models.Achievement]:
+        """Get achievements with criteria by ID."""
+        return self.repository.get_by_ids(achievement_ids)
+
+    def get_criteria_by_type(self, criterion_type: str) -> List[CachedCriterion]:
         """Get all criteria of specified type."""
-        return self.repository.get_criteria_by_type(criterion_type)
+        self._load_criteria()
+        return _CRITERIA_BY_TYPE.get(criterion_type, [])
+
+    def get_achievement_ids_for_criterion_types(
+        self, criterion_types: Iterable[str]
+    ) -> Set[int]:
+        """Get IDs of achievements with a criterion of any of the given types."""
+        self._load_criteria()
+        achievement_ids = set()
+        for criterion_type in criterion_types:
+            achievement_ids |= _ACHIEVEMENTS_BY_CRITERION_TYPE.get(criterion_type, set())
+        return achievement_ids
+
+    def _load_criteria(self) -> None:
+        """Load every criterion and index it by type, unless still cached."""
+        global _CRITERIA_BY_TYPE, _ACHIEVEMENTS_BY_CRITERION_TYPE, _CRITERIA_LOADED_AT
+        if (
+            _CRITERIA_BY_TYPE is None
+            or time.monotonic() - _CRITERIA_LOADED_AT > _CRITERIA_CACHE_TTL
+        ):
+            criteria_by_type: Dict[str, List[CachedCriterion]] = {}
+            achievements_by_type: Dict[str, Set[int]] = {}
+            for row in self.repository.get_all_criteria():
+                criterion = CachedCriterion(*row)
+                criteria_by_type.setdefault(criterion.criterion_type, []).append(
+                    criterion
+                )
+                achievements_by_type.setdefault(criterion.criterion_type, set()).add(
+                    criterion.achievement_id
+                )
+            _ACHIEVEMENTS_BY_CRITERION_TYPE = achievements_by_type
+            _CRITERIA_BY_TYPE = criteria_by_type
+            # Nothing seeded yet: use the empty result now, but reload next time
+            _CRITERIA_LOADED_AT = (
+                time.monotonic() if criteria_by_type else -float("inf")
+            )
 
     def get_user_achievements(self, user_id: int) -> List[models.UserAchievement]:
         """Get all achievements earned by user."""
@@ -41,6 +103,12 @@ class AchievementService:
         """Get all progress records for user."""
         return self.repository.get_user_all_progress(user_id)
 
+    def get_user_progress_map(
+        self, user_id: int, criterion_ids: Iterable[int]
+    ) -> Dict[int, models.UserAchievementProgress]:
+        """Get user's progress for several criteria, keyed by criterion ID."""
+        return self.repository.get_user_progress_map(user_id, criterion_ids)
+
     def create_or_update_progress(
         self, user_id: int, criterion_id: int, progress_value: int
     ) -> models.UserAchievementProgress:
@@ -49,6 +117,18 @@ class AchievementService:
             user_id, criterion_id, progress_value
         )
 
+    def upsert_progress(
+        self, user_id: int, progress_by_criterion: Dict[int, int]
+    ) -> None:
+        """Create or update several progress records at once."""
+        self.repository.upsert_progress(user_id, progress_by_criterion)
+
+    def increment_progress(
+        self, user_id: int, increments: Dict[int, Tuple[int, int]]
+    ) -> None:
+        """Atomically add to several progress records, capped at their targets."""
+        self.repository.increment_progress(user_id, increments)
+
     def create_user_achievement(
         self, user_id: int, achievement_id: int
     ) -> models.UserAchievement:
@@ -1,6 +1,9 @@
 # app/services/integration_service.py
-from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
+import hashlib
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.google_calendar import GoogleCalendarIntegration
@@ -8,14 +11,57 @@ from app.models.quest import Quest
 from app.repositories.google_calendar_repository import GoogleCalendarRepository
 from app.integrations.google.oauth import GoogleOAuthClient
 from app.integrations.google.calendar import GoogleCalendarClient
+from app.core.security import create_oauth_state, verify_oauth_state
 import logging
-import secrets
+import time
 
 logger = logging.getLogger(__name__)
 
-# Store OAuth states temporarily
-# In production, use Redis or another distributed cache
-OAUTH_STATES = {}
+# Refresh tokens this long before they expire so a call never goes out with
+# a token that lapses in flight
+TOKEN_REFRESH_SKEW = timedelta(minutes=5)
+# How often the background job refreshes tokens about to enter the skew window
+TOKEN_REFRESH_INTERVAL_SECONDS = 60
+# Concurrent requests for the same user within this window reuse the first
+# refresh instead of each asking Google for a new token
+TOKEN_REFRESH_DEDUP_SECONDS = 30
+
+# user_id -> time.monotonic() of the last successful refresh in this process
+_last_refreshed: Dict[int, float] = {}
+# integration id -> time.monotonic() at which its token enters the skew window
+_refresh_deadlines: Dict[int, float] = {}
+
+# Calendars a user can write to, cached briefly since the list rarely changes:
+# user_id -> (time.monotonic() expiry, calendars)
+CALENDAR_LIST_TTL_SECONDS = 300
+CALENDAR_LIST_CACHE_SIZE = 1024
+_calendar_lists: "OrderedDict[int, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+
+def _invalidate_calendar_list(user_id: int) -> None:
+    _calendar_lists.pop(user_id, None)
+
+
+def _oauth_state_digest(state: str) -> str:
+    """What is stored to recognize a state: its hash, not the token itself."""
+    return hashlib.sha256(state.encode()).hexdigest()
+
+
+def _cache_token_deadline(
+    integration: GoogleCalendarIntegration,
+    refresh_within: timedelta = TOKEN_REFRESH_SKEW,
+) -> bool:
+    """
+    Record when the integration's token needs refreshing, on the monotonic
+    clock, and return whether it is still valid for longer than refresh_within.
+    """
+    expiry = integration.token_expiry
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    seconds_left = (expiry - datetime.now(timezone.utc)).total_seconds()
+    refresh_in = seconds_left - TOKEN_REFRESH_SKEW.total_seconds()
+    _refresh_deadlines[integration.id] = time.monotonic() + refresh_in
+    return seconds_left > refresh_within.total_seconds()
 
 
 class GoogleCalendarService:
@@ -24,6 +70,8 @@ class GoogleCalendarService:
     def __init__(self, db: Session):
         self.db = db
         self.repository = GoogleCalendarRepository(db)
+        # Active integrations already looked up by this (request-scoped) service
+        self._integrations: Dict[int, GoogleCalendarIntegration] = {}
 
     def start_oauth_flow(self, user_id: int) -> Dict[str, Any]:
         """Start the Google OAuth flow for a user."""
@@ -31,23 +79,19 @@ class GoogleCalendarService:
             # Create OAuth flow
             flow = GoogleOAuthClient.create_oauth_flow()
 
-            # Generate state token
-            state = secrets.token_urlsafe(32)
+            # Generate a signed state token that expires on its own; it carries
+            # the user ID, so the integration is found without a state lookup
+            state = create_oauth_state(user_id)
 
-            # Store state token temporarily
-            OAUTH_STATES[state] = user_id
-
-            # Get or create integration record
+            # Get or create integration record. Only the latest state's digest
+            # is kept, which makes it the one state that can complete the flow
             integration = self.repository.get_by_user_id(user_id)
-            if integration:
-                integration.oauth_state = state
-                integration.connection_status = "authorizing"
-                self.repository.save(integration)
-            else:
-                integration = GoogleCalendarIntegration(
-                    user_id=user_id, oauth_state=state, connection_status="authorizing"
-                )
-                self.repository.save(integration)
+            if not integration:
+                integration = GoogleCalendarIntegration(user_id=user_id)
+            integration.oauth_state = _oauth_state_digest(state)
+            integration.connection_status = "authorizing"
+            self.repository.save(integration)
+            self.db.commit()
 
             # Generate authorization URL
             authorization_url, _ = flow.authorization_url(
@@ -59,24 +103,28 @@ class GoogleCalendarService:
 
             return {"authorization_url": authorization_url}
         except Exception as e:
-            logger.error(f"Error initiating Google OAuth flow: {e}")
+            logger.error("Error initiating Google OAuth flow: %s", e)
             raise ValueError(f"Failed to start Google authorization: {str(e)}")
 
     def complete_oauth_flow(self, state: str, code: str) -> GoogleCalendarIntegration:
         """Complete the OAuth flow with the received code."""
         try:
-            # Verify state and get integration
-            integration = self.repository.get_by_oauth_state(state)
-            if not integration:
-                raise ValueError("Invalid state parameter")
-
-            # Also check the temporary state storage
-            if state not in OAUTH_STATES or OAUTH_STATES[state] != integration.user_id:
-                raise ValueError("State mismatch")
+            # Verify the state signature and expiry
+            user_id = verify_oauth_state(state)
+            if user_id is None:
+                raise ValueError("Invalid or expired state parameter")
 
-            # Clean up temporary state
-            if state in OAUTH_STATES:
-                del OAUTH_STATES[state]
+            # The state must be the user's latest one and is cleared as it
+            # is checked, so it cannot be replayed once used
+            integration = self.repository.get_by_user_id(user_id)
+            if not integration or not self.repository.consume_oauth_state(
+                integration.id, _oauth_state_digest(state)
+            ):
+                self.db.rollback()
+                raise ValueError("Invalid state parameter")
+            # Spend the state before the token exchange, which also releases
+            # the row lock while Google is called
+            self.db.commit()
 
             # Exchange code for tokens
             credentials = GoogleOAuthClient.exchange_code(code)
@@ -88,7 +136,8 @@ class GoogleCalendarService:
             integration.access_token = credentials.token
             integration.refresh_token = credentials.refresh_token
             integration.token_expiry = token_expiry
-            integration.oauth_state = None  # Clear the state
+            _refresh_deadlines.pop(integration.id, None)
+            _invalidate_calendar_list(integration.user_id)
             integration.connection_status = "connected"
             integration.is_active = True
 
@@ -98,9 +147,10 @@ class GoogleCalendarService:
                 integration.selected_calendar_name = "Primary Calendar"
 
             self.repository.save(integration)
+            self.db.commit()
             return integration
         except Exception as e:
-            logger.error(f"Error completing OAuth flow: {e}")
+            logger.error("Error completing OAuth flow: %s", e)
             raise ValueError(f"Failed to complete Google authorization: {str(e)}")
 
     def get_integration(self, user_id: int) -> Optional[GoogleCalendarIntegration]:
@@ -116,83 +166,184 @@ class GoogleCalendarService:
     def refresh_tokens(self, integration: GoogleCalendarIntegration) -> bool:
         """Refresh OAuth tokens for an integration."""
         try:
-            credentials = GoogleOAuthClient.refresh_token(integration)
-            if not credentials:
-                return False
+            # Concurrent refreshes of the same integration queue on the row
+            # lock; if the previous holder already refreshed, reuse its token
+            if self.repository.lock(integration) is None:
+                refreshed = False
+            else:
+                refreshed = self._refresh_locked(integration, TOKEN_REFRESH_SKEW)
+        except Exception as e:
+            logger.error("Error refreshing tokens: %s", e)
+            refreshed = False
+        if refreshed:
+            self.db.commit()
+        else:
+            self.db.rollback()
+        return refreshed
+
+    def refresh_expiring_tokens(self) -> int:
+        """
+        Refresh active integrations whose tokens enter the skew window before
+        the next run, so requests rarely have to refresh inline.
+        Returns the number of refreshed integrations.
+        This is called by a scheduled job.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        window = TOKEN_REFRESH_SKEW + timedelta(seconds=TOKEN_REFRESH_INTERVAL_SECONDS)
+        integrations = self.repository.get_active_expiring_between(now, now + window)
+
+        refreshed_count = 0
+        for integration in integrations:
+            try:
+                # Another worker's job or a request is refreshing it already
+                if self.repository.lock(integration, skip_locked=True) is None:
+                    self.db.rollback()
+                    continue
+                refreshed = self._refresh_locked(integration, window)
+            except Exception as e:
+                logger.error("Error refreshing tokens: %s", e)
+                refreshed = False
+
+            # End each transaction before the next HTTPS call so no row stays
+            # locked for the whole run
+            if refreshed:
+                self.db.commit()
+                _last_refreshed[integration.user_id] = time.monotonic()
+                refreshed_count += 1
+            else:
+                self.db.rollback()
+                logger.warning(
+                    "Background token refresh failed for user %s", integration.user_id
+                )
+        return refreshed_count
+
+    def _refresh_locked(
+        self, integration: GoogleCalendarIntegration, refresh_within: timedelta
+    ) -> bool:
+        """
+        Refresh the token of an integration whose row the caller has locked,
+        unless it is valid for longer than refresh_within. Does not commit.
+        """
+        if integration.token_expiry and _cache_token_deadline(
+            integration, refresh_within
+        ):
+            return True
 
-            # Update integration with new tokens
-            integration.access_token = credentials.token
-            token_expiry = GoogleOAuthClient.parse_expiry(credentials.expiry)
-            integration.token_expiry = token_expiry
-            integration.connection_status = "connected"
+        credentials = GoogleOAuthClient.refresh_token(integration)
+        if not credentials:
+            return False
 
-            self.repository.save(integration)
+        # Update integration with new tokens
+        integration.access_token = credentials.token
+        token_expiry = GoogleOAuthClient.parse_expiry(credentials.expiry)
+        integration.token_expiry = token_expiry
+        integration.connection_status = "connected"
+
+        self.repository.save(integration)
+        _cache_token_deadline(integration)
+        return True
+
+    def _ensure_fresh(self, integration: GoogleCalendarIntegration) -> bool:
+        """Refresh the integration's tokens if they expire within the skew window."""
+        # Compare against the cached deadline first; the stored expiry is only
+        # converted when this process has not seen the token yet
+        if time.monotonic() < _refresh_deadlines.get(integration.id, 0):
             return True
-        except Exception as e:
-            logger.error(f"Error refreshing tokens: {e}")
+        if not integration.token_expiry or _cache_token_deadline(integration):
+            return True
+
+        # Another request just refreshed this user's token; pick up its result
+        refreshed_at = _last_refreshed.get(integration.user_id)
+        if (
+            refreshed_at is not None
+            and time.monotonic() - refreshed_at < TOKEN_REFRESH_DEDUP_SECONDS
+        ):
+            self.db.refresh(integration)
+            if not integration.token_expiry or _cache_token_deadline(integration):
+                return True
+
+        if not self.refresh_tokens(integration):
             return False
+        _last_refreshed[integration.user_id] = time.monotonic()
+        return True
 
-    def list_available_calendars(self, user_id: int) -> List[Dict[str, Any]]:
-        """List available calendars for a user."""
-        integration = self.get_active_integration(user_id)
-        if not integration:
-            raise ValueError("No active Google Calendar integration found")
+    def _active_integration(self, user_id: int) -> GoogleCalendarIntegration:
+        """Get the user's active integration, fetching it once per service instance."""
+        integration = self._integrations.get(user_id)
+        if integration is None:
+            integration = self.get_active_integration(user_id)
+            if not integration:
+                raise ValueError("No active Google Calendar integration found")
+            self._integrations[user_id] = integration
+        return integration
 
-        # Check if token is expired
-        if integration.token_expiry and integration.token_expiry < datetime.utcnow():
-            success = self.refresh_tokens(integration)
-            if not success:
-                raise ValueError("Failed to refresh expired token")
+    @contextmanager
+    def _calendar_client_for(
+        self, user_id: int
+    ) -> Iterator[Tuple[GoogleCalendarIntegration, GoogleCalendarClient, str]]:
+        """
+        Yield the user's active integration, a client with a fresh token and
+        the calendar to use. The integration is fetched once per service
+        instance, so several calendar calls in one request share the lookup.
+        Raises ValueError if any step fails.
+        """
+        integration = self._active_integration(user_id)
+
+        # Refresh the token if it is about to expire
+        if not self._ensure_fresh(integration):
+            raise ValueError("Failed to refresh expired token")
 
-        # Create calendar client
         calendar_client = GoogleCalendarClient.from_integration(integration)
         if not calendar_client:
             raise ValueError("Failed to create calendar client")
 
-        # List calendars
-        calendars = calendar_client.list_calendars()
+        # Use selected calendar if available, otherwise use primary
+        calendar_id = integration.selected_calendar_id or "primary"
+        yield integration, calendar_client, calendar_id
 
-        # Format response
-        result = []
-        for calendar in calendars:
-            # Only include calendars where the user has sufficient access
-            access_role = calendar.get("accessRole", "")
-            if access_role in ["owner", "writer"]:
-                result.append(
-                    {
-                        "id": calendar.get("id"),
-                        "name": calendar.get("summary", "Unnamed Calendar"),
-                        "description": calendar.get("description", ""),
-                        "primary": calendar.get("primary", False),
-                        "selected": (
-                            calendar.get("id") == integration.selected_calendar_id
-                        ),
-                        "color": calendar.get("backgroundColor", "#9FC6E7"),
-                        "access_role": access_role,
-                    }
+    def list_available_calendars(self, user_id: int) -> List[Dict[str, Any]]:
+        """List available calendars for a user."""
+        cached = _calendar_lists.get(user_id)
+        if cached is not None and time.monotonic() < cached[0]:
+            integration = self._active_integration(user_id)
+            calendars = cached[1]
+        else:
+            with self._calendar_client_for(user_id) as (integration, client, _):
+                # Only include calendars where the user has sufficient access
+                calendars = [
+                    calendar
+                    for calendar in client.list_calendars()
+                    if calendar.get("accessRole", "") in ["owner", "writer"]
+                ]
+            # An empty list is what the client returns on errors; don't keep it
+            if calendars:
+                _calendar_lists[user_id] = (
+                    time.monotonic() + CALENDAR_LIST_TTL_SECONDS,
+                    calendars,
                 )
+                _calendar_lists.move_to_end(user_id)
+                if len(_calendar_lists) > CALENDAR_LIST_CACHE_SIZE:
+                    _calendar_lists.popitem(last=False)
 
-        return result
+        # Format response
+        return [
+            {
+                "id": calendar.get("id"),
+                "name": calendar.get("summary", "Unnamed Calendar"),
+                "description": calendar.get("description", ""),
+                "primary": calendar.get("primary", False),
+                "selected": calendar.get("id") == integration.selected_calendar_id,
+                "color": calendar.get("backgroundColor", "#9FC6E7"),
+                "access_role": calendar.get("accessRole", ""),
+            }
+            for calendar in calendars
+        ]
 
     def select_calendar(self, user_id: int, calendar_id: str) -> Dict[str, Any]:
         """Select a calendar for a user."""
-        integration = self.get_active_integration(user_id)
-        if not integration:
-            raise ValueError("No active Google Calendar integration found")
-
-        # Check if token is expired
-        if integration.token_expiry and integration.token_expiry < datetime.utcnow():
-            success = self.refresh_tokens(integration)
-            if not success:
-                raise ValueError("Failed to refresh expired token")
-
-        # Create calendar client
-        calendar_client = GoogleCalendarClient.from_integration(integration)
-        if not calendar_client:
-            raise ValueError("Failed to create calendar client")
-
-        # Verify the calendar exists and is accessible
-        calendar = calendar_client.get_calendar(calendar_id)
+        with self._calendar_client_for(user_id) as (integration, calendar_client, _):
+            # Verify the calendar exists and is accessible
+            calendar = calendar_client.get_calendar(calendar_id)
         if not calendar:
             raise ValueError(f"Calendar {calendar_id} not found or not accessible")
 
@@ -201,6 +352,8 @@ class GoogleCalendarService:
         integration.selected_calendar_id = calendar_id
         integration.selected_calendar_name = calendar_name
         self.repository.save(integration)
+        self.db.commit()
+        _invalidate_calendar_list(user_id)
 
         return {
             "message": f"Calendar '{calendar_name}' selected successfully",
@@ -210,31 +363,13 @@ class GoogleCalendarService:
 
     def create_calendar_event(self, user_id: int, quest: Quest) -> Optional[str]:
         """Create a calendar event for a quest."""
-        integration = self.get_active_integration(user_id)
-        if not integration:
-            logger.warning(
-                f"No active Google Calendar integration found for user {user_id}"
-            )
-            return None
-
-        # Check if token is expired
-        if integration.token_expiry and integration.token_expiry < datetime.utcnow():
-            success = self.refresh_tokens(integration)
-            if not success:
-                logger.warning(f"Failed to refresh expired token for user {user_id}")
-                return None
-
-        # Create calendar client
-        calendar_client = GoogleCalendarClient.from_integration(integration)
-        if not calendar_client:
-            logger.warning(f"Failed to create calendar client for user {user_id}")
+        try:
+            with self._calendar_client_for(user_id) as (_, client, calendar_id):
+                event = client.create_event(quest, calendar_id)
+        except ValueError as e:
+            logger.warning("%s for user %s", e, user_id)
             return None
 
-        # Use selected calendar if available, otherwise use primary
-        calendar_id = integration.selected_calendar_id or "primary"
-
-        # Create event
-        event = calendar_client.create_event(quest, calendar_id)
         if not event:
             return None
 
@@ -245,33 +380,15 @@ class GoogleCalendarService:
         if not quest.google_calendar_event_id:
             return False
 
-        integration = self.get_active_integration(user_id)
-        if not integration:
-            logger.warning(
-                f"No active Google Calendar integration found for user {user_id}"
-            )
-            return False
-
-        # Check if token is expired
-        if integration.token_expiry and integration.token_expiry < datetime.utcnow():
-            success = self.refresh_tokens(integration)
-            if not success:
-                logger.warning(f"Failed to refresh expired token for user {user_id}")
-                return False
-
-        # Create calendar client
-        calendar_client = GoogleCalendarClient.from_integration(integration)
-        if not calendar_client:
-            logger.warning(f"Failed to create calendar client for user {user_id}")
+        try:
+            with self._calendar_client_for(user_id) as (_, client, calendar_id):
+                result = client.update_event(
+                    quest.google_calendar_event_id, quest, calendar_id
+                )
+        except ValueError as e:
+            logger.warning("%s for user %s", e, user_id)
             return False
 
-        # Use selected calendar if available, otherwise use primary
-        calendar_id = integration.selected_calendar_id or "primary"
-
-        # Update event
-        result = calendar_client.update_event(
-            quest.google_calendar_event_id, quest, calendar_id
-        )
         return result is not None
 
     def delete_calendar_event(self, user_id: int, quest: Quest) -> bool:
@@ -279,34 +396,16 @@ class GoogleCalendarService:
         if not quest.google_calendar_event_id:
             return False
 
-        integration = self.get_active_integration(user_id)
-        if not integration:
-            logger.warning(
-                f"No active Google Calendar integration found for user {user_id}"
-            )
-            return False
-
-        # Check if token is expired
-        if integration.token_expiry and integration.token_expiry < datetime.utcnow():
-            success = self.refresh_tokens(integration)
-            if not success:
-                logger.warning(f"Failed to refresh expired token for user {user_id}")
-                return False
-
-        # Create calendar client
-        calendar_client = GoogleCalendarClient.from_integration(integration)
-        if not calendar_client:
-            logger.warning(f"Failed to create calendar client for user {user_id}")
+        try:
+            with self._calendar_client_for(user_id) as (_, client, calendar_id):
+                return client.delete_event(quest.google_calendar_event_id, calendar_id)
+        except ValueError as e:
+            logger.warning("%s for user %s", e, user_id)
             return False
 
-        # Use selected calendar if available, otherwise use primary
-        calendar_id = integration.selected_calendar_id or "primary"
-
-        # Delete event
-        return calendar_client.delete_event(quest.google_calendar_event_id, calendar_id)
-
     def disconnect(self, user_id: int) -> bool:
         """Disconnect Google Calendar integration."""
+        self._integrations.pop(user_id, None)
         integration = self.repository.get_by_user_id(user_id)
         if not integration:
             return False
@@ -314,12 +413,15 @@ class GoogleCalendarService:
         if integration.access_token:
             revoked = GoogleOAuthClient.revoke_token(integration.access_token)
             if not revoked:
-                logger.warning(f"Failed to revoke Google token for user {user_id}")
+                logger.warning("Failed to revoke Google token for user %s", user_id)
 
         integration.is_active = False
         integration.connection_status = "disconnected"
         integration.access_token = None
         integration.refresh_token = None
         self.repository.save(integration)
+        self.db.commit()
+        _refresh_deadlines.pop(integration.id, None)
+        _invalidate_calendar_list(user_id)
 
         return True
@@ -1,5 +1,11 @@
+import io
 import logging
-from typing import Optional
+import mimetypes
+import re
+import textwrap
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Optional
 import asyncio
 
 from fastapi import UploadFile, HTTPException
@@ -7,10 +13,10 @@ from sqlalchemy.orm import Session
 
 from app.schemas.note import (
     NoteCreate, NoteUpdate, VoiceNoteCreate, NoteExport, 
-    Note, NoteList, ExportResponse, ShareLinkResponse, 
+    Note, NoteList, ShareLinkResponse, 
     UnshareResponse, FolderListResponse, TagListResponse, 
 )
-from app.models import Note
+from app.models import Note, Subscription
 from app.models.note import NoteStyle, NoteExportFormat
 from app.repositories.note_repository import NoteRepository
 from app.repositories.subscription_repository import SubscriptionRepository
@@ -19,113 +25,289 @@ from app.integrations.chat_completion import ChatCompletionService
 from app.core.config import settings
 from app.core.exceptions import ProcessingException
 from app.schemas.note import ProcessedVoiceNoteCreate, NoteProcessingStatus
+from app.schemas.note import Note as NoteSchema
 from app.core.constants import get_style_system_prompt
+from app.utils.audio_utils import (
+    delete_voice_note_audio,
+    save_voice_note_audio,
+    split_audio_on_silence,
+)
+from app.utils.concurrency import run_in_background
+
+try:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    _REPORTLAB_AVAILABLE = True
+except ImportError:
+    _REPORTLAB_AVAILABLE = False
+
+if _REPORTLAB_AVAILABLE:
+    # PDF styles are never modified, so they are built once and shared
+    _PDF_STYLES = getSampleStyleSheet()
+    _PDF_TITLE_STYLE = ParagraphStyle(
+        'TitleStyle',
+        parent=_PDF_STYLES['Heading1'],
+        fontSize=14,
+        spaceAfter=12
+    )
+    _PDF_SUBTITLE_STYLE = ParagraphStyle(
+        'SubtitleStyle',
+        parent=_PDF_STYLES['Heading2'],
+        fontSize=12,
+        spaceAfter=6
+    )
+    _PDF_NORMAL_STYLE = _PDF_STYLES["Normal"]
+
+# Canvas export layout: one inch margins and (font, size, leading) per kind
+# of line, matching the Platypus styles above
+_PDF_MARGIN = 72
+_PDF_TITLE_FONT = ("Helvetica-Bold", 14, 17)
+_PDF_HEADING_FONT = ("Helvetica-Bold", 12, 15)
+_PDF_BODY_FONT = ("Helvetica", 10, 12)
+
+# Platypus paragraphs are markup, so note text is escaped before going in
+_XML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# A line with at least one non-whitespace character
+_NON_BLANK_LINE = re.compile(r"^[^\S\n]*\S.*$", re.MULTILINE)
+
+
+def _non_blank_lines(text: str) -> Iterator[str]:
+    """Yield the non-blank lines of text without splitting it into a list"""
+    return (match.group() for match in _NON_BLANK_LINE.finditer(text))
+
+
 # Set up module logger
 logger = logging.getLogger(__name__)
 
+# Field names copied from ORM rows when building trusted list responses
+_NOTE_SCHEMA_FIELDS = tuple(NoteSchema.model_fields)
+
+# Export layouts. Optional sections are formatted separately and left empty
+# when the note doesn't have them
+_EXPORT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+_TEXT_RULE = "=" * 40
+_TEXT_UNDERLINE = "-" * 40
+
+_TEXT_EXPORT_TEMPLATE = (
+    "Title: {title}\nCreated: {created}\nUpdated: {updated}{tags}\n"
+    f"\n{_TEXT_RULE}\n"
+    "{summary}"
+    f"\nCONTENT\n{_TEXT_UNDERLINE}\n"
+    "{content}{action_items}"
+)
+_TEXT_EXPORT_TAGS = "\nTags: {}"
+_TEXT_EXPORT_SUMMARY = f"\nSUMMARY\n{_TEXT_UNDERLINE}\n{{}}\n\n{_TEXT_RULE}\n"
+_TEXT_EXPORT_ACTION_ITEMS = f"\n\n{_TEXT_RULE}\n\nACTION ITEMS\n{_TEXT_UNDERLINE}\n{{}}"
+
+_MARKDOWN_EXPORT_TEMPLATE = (
+    "# {title}\n*Created: {created}*\n*Updated: {updated}*{tags}\n"
+    "\n---\n"
+    "{summary}"
+    "\n## Content\n"
+    "{content}{action_items}"
+)
+_MARKDOWN_EXPORT_TAGS = "\n\n**Tags**: {}"
+_MARKDOWN_EXPORT_SUMMARY = "\n## Summary\n{}\n\n---\n"
+_MARKDOWN_EXPORT_ACTION_ITEMS = "\n\n---\n\n## Action Items\n{}"
+# Text exports of notes longer than this are formatted in a worker thread
+_INLINE_EXPORT_MAX_CHARS = 1_000_000
+
+# Export filenames go into a Content-Disposition header: whitespace, path
+# separators and control characters become underscores and quotes are dropped.
+# Other characters are kept; the route encodes non-ASCII names
+_FILENAME_TRANS = str.maketrans(
+    {
+        **{chr(code): "_" for code in (*range(32), 127)},
+        " ": "_",
+        "/": "_",
+        "\\": "_",
+        '"': None,
+        "'": None,
+    }
+)
+_FILENAME_MAX_CHARS = 120
+
+# Content shorter than this isn't worth an LLM call
+_MIN_AI_CONTENT_CHARS = 40
+
+# LLM prompts, dedented once so indentation isn't sent as input tokens
+_STYLE_PROMPT = "Process this content according to the {style} style:\n{content}"
+_SUMMARY_PROMPT = (
+    "Create a concise summary (3-5 sentences) of the main points in this content:\n"
+    "{content}"
+)
+_SUMMARY_SYSTEM_PROMPT = textwrap.dedent(
+    """
+    You are a summarization expert. Your task is to extract the key points from a piece of content
+    and present them in a concise, clear manner. Focus on the most important information.
+    """
+).strip()
+_ACTION_ITEMS_PROMPT = textwrap.dedent(
+    """
+    Extract all action items, tasks or to-dos mentioned in this content:
+    {content}
+
+    Format as a bulleted list. If no specific actions are mentioned, respond with "No action items identified."
+    """
+).strip()
+_ACTION_ITEMS_SYSTEM_PROMPT = textwrap.dedent(
+    """
+    You are an action item extraction specialist. Your task is to identify all tasks,
+    to-dos, and action items mentioned in the content. Format them as a clear, actionable list.
+    """
+).strip()
+_TRANSCRIPT_PROMPT = textwrap.dedent(
+    """
+    Transform this raw voice transcript into content following the "{style}" style. The transcript was:
+
+    "{transcript}"
+
+    Format and structure the content appropriately for a {style_name}.
+    The first line of the content should be the title of the note. It has to finish with a new line so I can properly parse it.
+    Don't analyze the language or provide linguistic breakdowns - focus on creating the actual content.
+    """
+).strip()
+
+
+def _should_ai_process(content: Optional[str]) -> bool:
+    """Whether note content is long enough to be worth processing with AI"""
+    return bool(content) and len(content.strip()) >= _MIN_AI_CONTENT_CHARS
+
 
 class NoteService:
     """Service for note operations."""
 
     def __init__(self, db: Session):
+        self.db = db
         self.repository = NoteRepository(db)
         self.subscription_repository = SubscriptionRepository(db)
         self.speech_client = get_stt_client()
         self.chat_completion_service = ChatCompletionService()
+        # Subscriptions fetched during this request, keyed by user ID
+        self._subscriptions: Dict[int, Optional[Subscription]] = {}
 
     async def create_note(self, user_id: int, data: NoteCreate) -> Note:
         """Create a regular text note"""
-        # Check if AI processing is requested
-        if data.ai_process and data.content:
+        # Check if AI processing is requested and worthwhile
+        if data.ai_process and _should_ai_process(data.content):
             # Check if user has permission for AI processing
-            subscription = self.subscription_repository.get_by_user_id(user_id)
+            subscription = self._get_subscription(user_id)
             has_ai_features = subscription and subscription.advanced_ai_features
 
             if has_ai_features:
                 logger.info(f"Processing note with AI for user {user_id}")
-                try:
-                    # Get system prompt based on note style
-                    system_prompt = get_style_system_prompt(data.note_style)
+                content, summary, action_items = await self._ai_enrich(
+                    data.content, data.note_style
+                )
+                if content:
+                    data.content = content
+                if summary:
+                    data.ai_summary = summary
+                if action_items:
+                    data.extracted_action_items = action_items
 
-                    # Process content with AI
-                    prompt = f"""
-                    Process this content according to the {data.note_style} style:
-                    {data.content}
-                    """
+        # Create the note with processed content and AI attributes
+        return self.repository.create_note(user_id, data)
 
-                    processed_content = await self.chat_completion_service.call_llm_api(
-                        prompt=prompt, system_prompt=system_prompt, temperature=0.7
-                    )
+    async def _ai_enrich(
+        self, content: str, note_style: NoteStyle
+    ) -> tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Process note content with AI.
 
-                    if processed_content:
-                        data.content = processed_content
-
-                    # Generate summary if needed
-                    if data.note_style not in [
-                        NoteStyle.SUMMARY
-                    ]:  # Don't summarize a summary
-                        summary_prompt = f"""
-                        Create a concise summary (3-5 sentences) of the main points in this content:
-                        {data.content}
-                        """
-                        summary_system_prompt = """
-                        You are a summarization expert. Your task is to extract the key points from a piece of content 
-                        and present them in a concise, clear manner. Focus on the most important information.
-                        """
-
-                        summary_result = (
-                            await self.chat_completion_service.call_llm_api(
-                                prompt=summary_prompt,
-                                system_prompt=summary_system_prompt,
-                                temperature=0.5,
-                            )
-                        )
-
-                        if summary_result:
-                            data.ai_summary = summary_result
-
-                    # Extract action items if applicable
-                    if data.note_style in [
-                        NoteStyle.ACTION_ITEMS,
-                        NoteStyle.TASK_LIST,
-                        NoteStyle.MEETING_NOTES,
-                    ]:
-                        action_prompt = f"""
-                        Extract all action items, tasks or to-dos mentioned in this content:
-                        {data.content}
-                        
-                        Format as a bulleted list. If no specific actions are mentioned, respond with "No action items identified."
-                        """
-                        action_system_prompt = """
-                        You are an action item extraction specialist. Your task is to identify all tasks, 
-                        to-dos, and action items mentioned in the content. Format them as a clear, actionable list.
-                        """
-
-                        action_result = await self.chat_completion_service.call_llm_api(
-                            prompt=action_prompt,
-                            system_prompt=action_system_prompt,
-                            temperature=0.3,
-                        )
-
-                        if action_result:
-                            data.extracted_action_items = action_result
-                except Exception as e:
-                    logger.error(
-                        f"Error processing note with AI: {str(e)}", exc_info=True
-                    )
-                    # Continue with the original content if AI processing fails
+        Returns:
+            - content: The content rewritten in the note style
+            - summary: A summary, or None for summary-style notes
+            - action_items: Extracted action items, or None for styles without them
+            Any part that fails is None as well.
+        """
+        # Style processing, summary and action items are independent
+        # of each other, so they are requested concurrently. The
+        # summary and action items work from the original content
+        requests = {}
+
+        # Process content with AI
+        requests["content"] = dict(
+            prompt=_STYLE_PROMPT.format(style=note_style, content=content),
+            system_prompt=get_style_system_prompt(note_style),
+            temperature=0.7,
+        )
 
-        # Create the note with processed content and AI attributes
-        return self.repository.create_note(user_id, data)
+        # Generate summary if needed
+        if note_style not in [NoteStyle.SUMMARY]:  # Don't summarize a summary
+            requests["ai_summary"] = dict(
+                prompt=_SUMMARY_PROMPT.format(content=content),
+                system_prompt=_SUMMARY_SYSTEM_PROMPT,
+                temperature=0.5,
+            )
+
+        # Extract action items if applicable
+        if note_style in [
+            NoteStyle.ACTION_ITEMS,
+            NoteStyle.TASK_LIST,
+            NoteStyle.MEETING_NOTES,
+        ]:
+            requests["extracted_action_items"] = dict(
+                prompt=_ACTION_ITEMS_PROMPT.format(content=content),
+                system_prompt=_ACTION_ITEMS_SYSTEM_PROMPT,
+                temperature=0.3,
+            )
+
+        # A failed call only costs its own field, not the others. Each call
+        # is bounded by the client's per-attempt timeout and retries
+        results = await asyncio.gather(
+            *(
+                self.chat_completion_service.call_llm_api(**request)
+                for request in requests.values()
+            ),
+            return_exceptions=True,
+        )
+
+        enriched = dict.fromkeys(("content", "ai_summary", "extracted_action_items"))
+        for field, result in zip(requests, results):
+            if isinstance(result, Exception):
+                # Leave this part out if it fails; the rest still applies
+                logger.error(
+                    f"Error processing note with AI ({field}): {str(result)}",
+                    exc_info=result,
+                )
+            else:
+                enriched[field] = result
+
+        return (
+            enriched["content"],
+            enriched["ai_summary"],
+            enriched["extracted_action_items"],
+        )
 
     async def get_note(self, user_id: int, note_id: int) -> Note:
         """Get a note by ID, ensuring the user is the owner"""
+        return self._get_user_note_or_404(user_id, note_id)
+
+    def _get_user_note_or_404(
+        self, user_id: int, note_id: int, action: Optional[str] = None
+    ) -> Note:
+        """Get a user's note, raising a 404 if it doesn't exist or isn't theirs"""
         note = self.repository.get_user_note(user_id, note_id)
         if not note:
-            logger.warning(f"Note {note_id} not found for user {user_id}")
+            during = f" during {action}" if action else ""
+            logger.warning(f"Note {note_id} not found for user {user_id}{during}")
             raise HTTPException(status_code=404, detail="Note not found")
         return note
 
+    def _get_subscription(self, user_id: int) -> Optional[Subscription]:
+        """Get the user's subscription, fetching it once per service instance"""
+        if user_id not in self._subscriptions:
+            self._subscriptions[user_id] = self.subscription_repository.get_by_user_id(
+                user_id
+            )
+        return self._subscriptions[user_id]
+
     async def get_public_note(self, share_id: str) -> Note:
         """Get a note by public share ID"""
         note = self.repository.get_by_share_id(share_id)
@@ -136,21 +318,13 @@ class NoteService:
 
     async def update_note(self, user_id: int, note_id: int, data: NoteUpdate) -> Note:
         """Update a note"""
-        note = self.repository.get_user_note(user_id, note_id)
-        if not note:
-            logger.warning(f"Note {note_id} not found for user {user_id} during update")
-            raise HTTPException(status_code=404, detail="Note not found")
-        
+        note = self._get_user_note_or_404(user_id, note_id, "update")
+
         return self.repository.update_note(note, data)
 
     async def delete_note(self, user_id: int, note_id: int) -> None:
         """Delete a note"""
-        note = self.repository.get_user_note(user_id, note_id)
-        if not note:
-            logger.warning(
-                f"Note {note_id} not found for user {user_id} during deletion"
-            )
-            raise HTTPException(status_code=404, detail="Note not found")
+        note = self._get_user_note_or_404(user_id, note_id, "deletion")
 
         self.repository.delete_note(note)
 
@@ -169,8 +343,20 @@ class NoteService:
         notes_data = self.repository.get_user_notes(
             user_id, skip, limit, folder, tag, search, sort_by, sort_order
         )
+        notes_data["items"] = [self._note_from_orm(row) for row in notes_data["items"]]
         return NoteList(**notes_data)
 
+    def _note_from_orm(self, row: Note) -> NoteSchema:
+        """
+        Build a Note schema from a row we just loaded from our own database.
+
+        The row is already typed by the ORM, so validation is skipped. Only use
+        this on trusted read paths; user-supplied data must still be validated.
+        """
+        return NoteSchema.model_construct(
+            **{field: getattr(row, field) for field in _NOTE_SCHEMA_FIELDS}
+        )
+
     async def get_folders(self, user_id: int) -> FolderListResponse:
         """Get a list of unique folders used by the user"""
         folders = self.repository.get_folders(user_id)
@@ -183,29 +369,18 @@ class NoteService:
 
     async def generate_share_link(self, user_id: int, note_id: int) -> ShareLinkResponse:
         """Generate a public share link for a note"""
-        # Get the note and verify ownership
-        note = self.repository.get_user_note(user_id, note_id)
-        if not note:
-            logger.warning(f"Note {note_id} not found for user {user_id}")
+        # Verifies ownership and reuses an existing share ID in one statement
+        shared = self.repository.generate_share_link(user_id, note_id)
+        if shared is None:
+            logger.warning(f"Note {note_id} not found for user {user_id} during sharing")
             raise HTTPException(status_code=404, detail="Note not found")
-
-        # Check if the note already has a share link
-        if note.public_share_id:
-            # Return existing share info
-            return ShareLinkResponse(
-                share_id=note.public_share_id,
-                share_url=f"{settings.FRONTEND_URL}/notes/shared/{note.public_share_id}",
-                already_shared=True,
-            )
-
-        # Generate a new share ID
-        note = self.repository.generate_share_link(note)
+        share_id, already_shared = shared
 
         # Return share info
         return ShareLinkResponse(
-            share_id=note.public_share_id,
-            share_url=f"{settings.FRONTEND_URL}/notes/shared/{note.public_share_id}",
-            already_shared=False,
+            share_id=share_id,
+            share_url=f"{settings.FRONTEND_URL}/notes/shared/{share_id}",
+            already_shared=already_shared,
         )
 
     async def share_note(self, user_id: int, note_id: int) -> ShareLinkResponse:
@@ -214,21 +389,13 @@ class NoteService:
 
     async def remove_share_link(self, user_id: int, note_id: int) -> UnshareResponse:
         """Remove public sharing for a note"""
-        # Get the note and verify ownership
-        note = self.repository.get_user_note(user_id, note_id)
-        if not note:
-            logger.warning(f"Note {note_id} not found for user {user_id}")
+        # Verifies ownership and clears the share ID in one statement
+        was_shared = self.repository.remove_share_link(user_id, note_id)
+        if was_shared is None:
+            logger.warning(f"Note {note_id} not found for user {user_id} during unsharing")
             raise HTTPException(status_code=404, detail="Note not found")
 
-        # Check if the note has a share link
-        if not note.public_share_id:
-            return UnshareResponse(success=True, already_unshared=True)
-
-        # Remove share ID
-        note.public_share_id = None
-        self.repository.save(note)
-
-        return UnshareResponse(success=True, already_unshared=False)
+        return UnshareResponse(success=True, already_unshared=not was_shared)
     
     async def unshare_note(self, user_id: int, note_id: int) -> UnshareResponse:
         """Remove public share link for a note (alias for remove_share_link)"""
@@ -236,13 +403,17 @@ class NoteService:
 
     async def export_note(
         self, user_id: int, note_id: int, format: NoteExportFormat = NoteExportFormat.TEXT
-    ) -> ExportResponse:
-        """Export a note in the specified format"""
+    ) -> tuple[bytes, str, str]:
+        """
+        Export a note in the specified format.
+
+        Returns:
+            - content: The exported file content
+            - content_type: The MIME type of the exported file
+            - filename: The suggested download filename
+        """
         # Get the note and verify ownership
-        note = self.repository.get_user_note(user_id, note_id)
-        if not note:
-            logger.warning(f"Note {note_id} not found for user {user_id} during export")
-            raise HTTPException(status_code=404, detail="Note not found")
+        note = self._get_user_note_or_404(user_id, note_id, "export")
 
         # Prepare export data
         note_export = NoteExport(
@@ -255,87 +426,83 @@ class NoteService:
             extracted_action_items=note.extracted_action_items,
         )
 
+        safe_name = (note.title or "note").translate(_FILENAME_TRANS)[
+            :_FILENAME_MAX_CHARS
+        ]
+
         # Generate content based on format
         if format == NoteExportFormat.TEXT:
-            content = self._format_note_as_text(note_export).encode("utf-8")
+            content = await self._format_export(self._format_note_as_text, note_export)
             content_type = "text/plain"
-            filename = f"{note.title.replace(' ', '_')}.txt"
+            extension = "txt"
         elif format == NoteExportFormat.MARKDOWN:
-            content = self._format_note_as_markdown(note_export).encode("utf-8")
+            content = await self._format_export(self._format_note_as_markdown, note_export)
             content_type = "text/markdown"
-            filename = f"{note.title.replace(' ', '_')}.md"
+            extension = "md"
         elif format == NoteExportFormat.PDF:
-            content = self._generate_pdf(note_export)
+            content = await self._generate_pdf(note_export)
             content_type = "application/pdf"
-            filename = f"{note.title.replace(' ', '_')}.pdf"
+            extension = "pdf"
         else:
             # Default to text
-            content = self._format_note_as_text(note_export).encode("utf-8")
+            content = await self._format_export(self._format_note_as_text, note_export)
             content_type = "text/plain"
-            filename = f"{note.title.replace(' ', '_')}.txt"
+            extension = "txt"
+
+        return content, content_type, f"{safe_name}.{extension}"
 
-        return ExportResponse(
-            content=content,
-            content_type=content_type,
-            filename=filename
+    async def _format_export(self, formatter, note_export: NoteExport) -> bytes:
+        """
+        Format and encode a text export, in a worker thread for very long
+        notes; short ones aren't worth the thread hop.
+        """
+        if len(note_export.content) <= _INLINE_EXPORT_MAX_CHARS:
+            return formatter(note_export).encode("utf-8")
+        return await asyncio.to_thread(
+            lambda: formatter(note_export).encode("utf-8")
         )
 
     def _format_note_as_text(self, note_export: NoteExport) -> str:
         """Format note as plain text"""
-        lines = []
-        lines.append(f"Title: {note_export.title}")
-        lines.append(f"Created: {note_export.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"Updated: {note_export.updated_at.strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        if note_export.tags:
-            lines.append(f"Tags: {note_export.tags}")
-        
-        lines.append("\n" + "=" * 40 + "\n")
-        
-        if note_export.ai_summary:
-            lines.append("SUMMARY")
-            lines.append("-" * 40)
-            lines.append(note_export.ai_summary)
-            lines.append("\n" + "=" * 40 + "\n")
-        
-        lines.append("CONTENT")
-        lines.append("-" * 40)
-        lines.append(note_export.content)
-        
-        if note_export.extracted_action_items:
-            lines.append("\n" + "=" * 40 + "\n")
-            lines.append("ACTION ITEMS")
-            lines.append("-" * 40)
-            lines.append(note_export.extracted_action_items)
-        
-        return "\n".join(lines)
+        return _TEXT_EXPORT_TEMPLATE.format(
+            title=note_export.title,
+            created=note_export.created_at.strftime(_EXPORT_TIMESTAMP_FORMAT),
+            updated=note_export.updated_at.strftime(_EXPORT_TIMESTAMP_FORMAT),
+            tags=_TEXT_EXPORT_TAGS.format(note_export.tags) if note_export.tags else "",
+            summary=(
+                _TEXT_EXPORT_SUMMARY.format(note_export.ai_summary)
+                if note_export.ai_summary
+                else ""
+            ),
+            content=note_export.content,
+            action_items=(
+                _TEXT_EXPORT_ACTION_ITEMS.format(note_export.extracted_action_items)
+                if note_export.extracted_action_items
+                else ""
+            ),
+        )
 
     def _format_note_as_markdown(self, note_export: NoteExport) -> str:
         """Format note as markdown"""
-        lines = []
-        lines.append(f"# {note_export.title}")
-        lines.append(f"*Created: {note_export.created_at.strftime('%Y-%m-%d %H:%M:%S')}*")
-        lines.append(f"*Updated: {note_export.updated_at.strftime('%Y-%m-%d %H:%M:%S')}*")
-        
-        if note_export.tags:
-            lines.append(f"\n**Tags**: {note_export.tags}")
-        
-        lines.append("\n---\n")
-        
-        if note_export.ai_summary:
-            lines.append("## Summary")
-            lines.append(note_export.ai_summary)
-            lines.append("\n---\n")
-        
-        lines.append("## Content")
-        lines.append(note_export.content)
-        
-        if note_export.extracted_action_items:
-            lines.append("\n---\n")
-            lines.append("## Action Items")
-            lines.append(note_export.extracted_action_items)
-        
-        return "\n".join(lines)
+        return _MARKDOWN_EXPORT_TEMPLATE.format(
+            title=note_export.title,
+            created=note_export.created_at.strftime(_EXPORT_TIMESTAMP_FORMAT),
+            updated=note_export.updated_at.strftime(_EXPORT_TIMESTAMP_FORMAT),
+            tags=(
+                _MARKDOWN_EXPORT_TAGS.format(note_export.tags) if note_export.tags else ""
+            ),
+            summary=(
+                _MARKDOWN_EXPORT_SUMMARY.format(note_export.ai_summary)
+                if note_export.ai_summary
+                else ""
+            ),
+            content=note_export.content,
+            action_items=(
+                _MARKDOWN_EXPORT_ACTION_ITEMS.format(note_export.extracted_action_items)
+                if note_export.extracted_action_items
+                else ""
+            ),
+        )
     
     async def create_voice_note(
         self, user_id: int, note_data: VoiceNoteCreate, audio_duration_minutes: float
@@ -346,11 +513,14 @@ class NoteService:
             # Check if we should process synchronously (less than 1 minute)
             is_processing_sync = audio_duration_minutes < 1
             logger.info(f"Audio duration: {audio_duration_minutes:.2f} minutes, processing {'synchronously' if is_processing_sync else 'asynchronously'}")
+
+            # Read the upload once; everything downstream works from these bytes
+            audio = await note_data.audio_file.read()
             
             if is_processing_sync:
                 # For short audio, process synchronously and create with processed content
                 logger.info(f"Processing short audio synchronously for user {user_id}")
-                processed_voice_note_data = await self.process_audio_upload_sync(user_id, note_data, audio_duration_minutes)
+                processed_voice_note_data = await self.process_audio_upload_sync(user_id, note_data, audio_duration_minutes, audio)
                 
                 # Track usage AFTER successful processing for sync processing
                 self.subscription_repository.track_usage(user_id, audio_duration_minutes)
@@ -360,30 +530,38 @@ class NoteService:
                     processed_voice_note_data
                 )
             else:
-                # For longer audio, first track usage, then create note, then process asynchronously
+                # For longer audio, first create the note, then track usage, then process asynchronously
                 # We'll need to potentially refund minutes if processing fails
-                
-                # Create note first with pending status
-                note = self.repository.create_voice_note(
-                    user_id,
-                    note_data,
-                    audio_duration_minutes=audio_duration_minutes,
+
+                # Store the audio for async processing; the upload is closed
+                # once this request finishes
+                audio_path = await asyncio.to_thread(
+                    save_voice_note_audio, audio, note_data.audio_file.filename
                 )
-                note.processing_status = NoteProcessingStatus.PROCESSING
-                self.repository.save(note)
-                
+
+                # Create the note already processing, pointing at its audio
+                try:
+                    note = self.repository.create_voice_note(
+                        user_id,
+                        note_data,
+                        audio_duration_minutes=audio_duration_minutes,
+                        audio_url=audio_path,
+                    )
+                except Exception:
+                    await asyncio.to_thread(delete_voice_note_audio, audio_path)
+                    raise
+
                 # Track usage for async processing, but store the tracking info on the note
-                # so we can potentially refund it if processing fails
-                self.subscription_repository.track_usage(user_id, audio_duration_minutes)
+                # so we can potentially refund it if processing fails. Both
+                # are committed together by track_usage
                 note.minutes_tracked = float(audio_duration_minutes)
-                self.repository.save(note)
-                
-                # Make a copy of the file for async processing
-                await note_data.audio_file.seek(0)
+                self.subscription_repository.track_usage(user_id, audio_duration_minutes)
                 
                 # Process audio asynchronously
-                asyncio.create_task(
-                    self.process_audio_upload_async(user_id, note.id, note_data)
+                run_in_background(
+                    self.process_audio_upload_async(
+                        user_id, note.id, note_data, audio_path
+                    )
                 )
             
             return note
@@ -397,15 +575,20 @@ class NoteService:
             )
 
     async def process_audio_upload_sync(
-        self, user_id: int, note_data: VoiceNoteCreate, audio_duration_minutes: float
+        self,
+        user_id: int,
+        note_data: VoiceNoteCreate,
+        audio_duration_minutes: float,
+        audio: bytes,
     ) -> ProcessedVoiceNoteCreate:
         """
         Process audio synchronously for short voice recordings (<1 minute).
         
         Args:
             user_id: The ID of the user who created the recording
-            audio_file: The uploaded audio file
             note_data: The voice note creation data (title, note_style, etc.)
+            audio_duration_minutes: Length of the recording
+            audio: The uploaded audio, already read from note_data.audio_file
             
         Returns:
             A dictionary containing all processed data needed to create a note:
@@ -420,11 +603,13 @@ class NoteService:
             Exception: Any other processing errors
         """
         try:
-            # Reset file pointer to the beginning
-            await note_data.audio_file.seek(0)
             # Transcribe the audio
             logger.info(f"Starting synchronous audio transcription for user {user_id}")
-            transcription_result = await self.speech_client.transcribe(note_data.audio_file, note_data.map_to_deepgram_language(note_data.language))
+            transcription_result = await self.speech_client.transcribe_chunks(
+                [audio],
+                note_data.audio_file.content_type,
+                note_data.map_to_deepgram_language(note_data.language),
+            )
             raw_transcript = transcription_result.text
             if not raw_transcript:
                 logger.warning(f"Empty transcript received for user {user_id}")
@@ -459,7 +644,7 @@ class NoteService:
             raise
 
     async def process_audio_upload_async(
-        self, user_id: int, note_id: int, note_data: VoiceNoteCreate
+        self, user_id: int, note_id: int, note_data: VoiceNoteCreate, audio_path: str
     ) -> None:
         """
         Process audio asynchronously for longer voice recordings (>= 1 minute).
@@ -468,8 +653,9 @@ class NoteService:
         Args:
             user_id: The ID of the user who created the recording
             note_id: The ID of the note to update with processing results
-            audio_file: The uploaded audio file
-            note_data: The voice note creation data (title, note_style, etc.)
+            note_data: The voice note creation data (title, note_style, etc.);
+                its audio_file is not read, as the upload may already be closed
+            audio_path: Where the uploaded audio was stored
             
         Note:
             This method doesn't return any value as it's designed to be run as a background task.
@@ -479,11 +665,11 @@ class NoteService:
             3. Attempt to refund usage minutes for fairness
         """
         try:
-            # Reset file pointer to the beginning
-            await note_data.audio_file.seek(0)
             # Transcribe the audio
             logger.info(f"Starting asynchronous audio transcription for user {user_id}, note {note_id}")
-            transcription_result = await self.speech_client.transcribe(note_data.audio_file, note_data.map_to_deepgram_language(note_data.language))
+            transcription_result = await self._transcribe_long_audio(
+                audio_path, note_data.map_to_deepgram_language(note_data.language)
+            )
             raw_transcript = transcription_result.text
             if not raw_transcript:
                 logger.warning(f"Empty transcript received for user {user_id}")
@@ -514,6 +700,7 @@ class NoteService:
             note.language = transcription_result.map_to_note_language(transcription_result.language) if transcription_result.language else None
             note.ai_processed = True
             note.processing_status = NoteProcessingStatus.COMPLETED
+            note.audio_url = None
             
             self.repository.save(note)
             
@@ -524,26 +711,82 @@ class NoteService:
             
             # Update note with error status and refund minutes
             try:
-                note = self.repository.get_user_note(user_id, note_id)
-                if note:
-                    note.processing_status = NoteProcessingStatus.ERROR
-                    note.processing_error = str(e)[:255]  # Limit error message length
-                    
-                    # Refund the minutes if they were tracked for this note
-                    if note.minutes_tracked:
-                        try:
-                            # Attempt to refund the minutes to the user
-                            self.subscription_repository.refund_usage(user_id, note.minutes_tracked)
-                            note.minutes_refunded = True
-                            logger.info(f"Refunded {note.minutes_tracked} minutes to user {user_id} due to processing error")
-                        except Exception as refund_error:
-                            logger.error(f"Failed to refund minutes: {str(refund_error)}")
-                            note.minutes_refunded = False
-                    
-                    self.repository.save(note)
+                await self._fail_processing(note_id, str(e))
             except Exception as update_error:
                 logger.error(f"Failed to update note with error status: {str(update_error)}")
 
+        finally:
+            await asyncio.to_thread(delete_voice_note_audio, audio_path)
+
+    async def fail_stale_voice_notes(self) -> int:
+        """
+        Fail voice notes whose background processing was lost, e.g. because the
+        worker restarted, and refund their minutes.
+
+        Returns:
+            The number of notes failed
+        """
+        updated_before = datetime.utcnow() - timedelta(
+            seconds=settings.VOICE_NOTE_PROCESSING_TIMEOUT
+        )
+        failed_count = 0
+        # Every worker sweeps; each note is failed by whichever claims it first
+        for note in self.repository.get_stale_processing(updated_before):
+            if await self._fail_processing(note.id, "Processing was interrupted"):
+                logger.warning(f"Voice note {note.id} processing was interrupted")
+                failed_count += 1
+        return failed_count
+
+    async def _fail_processing(self, note_id: int, error: str) -> bool:
+        """
+        Mark a voice note as failed and refund its tracked minutes, unless it
+        already left processing. Returns whether this call failed it.
+        """
+        note = self.repository.mark_processing_failed(note_id, error)
+        if note is None:
+            self.db.rollback()
+            return False
+        audio_url = note.audio_url
+        note.audio_url = None
+
+        # Refund the minutes if they were tracked for this note. The refund
+        # commits the note's new status and refund flag with it, so a note is
+        # refunded at most once
+        if note.minutes_tracked and not note.minutes_refunded:
+            note.minutes_refunded = True
+            try:
+                self.subscription_repository.refund_usage(note.owner_id, note.minutes_tracked)
+                logger.info(f"Refunded {note.minutes_tracked} minutes to user {note.owner_id} due to processing error")
+            except Exception as refund_error:
+                # The note stays processing, so the stale sweep retries it
+                logger.error(f"Failed to refund minutes: {str(refund_error)}")
+                self.db.rollback()
+                return False
+
+        self.repository.save(note)
+        await asyncio.to_thread(delete_voice_note_audio, audio_url)
+        return True
+
+    async def _transcribe_long_audio(self, audio_path: str, language=None):
+        """
+        Transcribe a stored recording as silence-separated chunks in parallel,
+        falling back to a single pass if the audio can't be split.
+        """
+        audio = await asyncio.to_thread(Path(audio_path).read_bytes)
+
+        try:
+            chunks = await asyncio.to_thread(split_audio_on_silence, audio, audio_path)
+        except Exception as e:
+            logger.warning(f"Could not split audio for parallel transcription: {str(e)}")
+            chunks = []
+
+        if len(chunks) < 2:
+            mimetype = mimetypes.guess_type(audio_path)[0] or "application/octet-stream"
+            return await self.speech_client.transcribe_chunks([audio], mimetype, language)
+
+        logger.info(f"Transcribing audio in {len(chunks)} chunks")
+        return await self.speech_client.transcribe_chunks(chunks, "audio/wav", language)
+
     async def _process_transcript_with_ai(self, transcript: str, note_style: NoteStyle) -> tuple[Optional[str], Optional[str]]:
         """
         Process a transcript with AI to generate structured content, summary, and action items.
@@ -561,15 +804,11 @@ class NoteService:
         style_system_prompt = get_style_system_prompt(note_style)
 
         # Generate structured content based on note style
-        prompt = f"""
-        Transform this raw voice transcript into content following the "{note_style}" style. The transcript was: 
-        
-        "{transcript}"
-        
-        Format and structure the content appropriately for a {note_style.replace('_', ' ')}.
-        The first line of the content should be the title of the note. It has to finish with a new line so I can properly parse it.
-        Don't analyze the language or provide linguistic breakdowns - focus on creating the actual content.
-        """
+        prompt = _TRANSCRIPT_PROMPT.format(
+            style=note_style,
+            transcript=transcript,
+            style_name=note_style.replace("_", " "),
+        )
 
         processed_result = await self.chat_completion_service.call_llm_api(
             prompt=prompt, system_prompt=style_system_prompt, temperature=0.7
@@ -581,95 +820,146 @@ class NoteService:
         else:
             return None, None
 
-    def _generate_pdf(self, note_export: NoteExport) -> bytes:
-        """Generate PDF from note data"""
-        try:
-            from reportlab.lib.pagesizes import letter
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib import colors
-            import io
-            
-            # Create in-memory PDF
-            buffer = io.BytesIO()
-            
-            # Set up PDF document
-            doc = SimpleDocTemplate(buffer, pagesize=letter)
-            styles = getSampleStyleSheet()
-            
-            # Create custom styles
-            title_style = ParagraphStyle(
-                'TitleStyle',
-                parent=styles['Heading1'],
-                fontSize=14,
-                spaceAfter=12
-            )
-            
-            subtitle_style = ParagraphStyle(
-                'SubtitleStyle',
-                parent=styles['Heading2'],
-                fontSize=12,
-                spaceAfter=6
+    async def _generate_pdf(self, note_export: NoteExport) -> bytes:
+        """
+        Generate PDF from note data. Rendering takes long enough to stall
+        other requests, so it runs in a worker thread.
+        """
+        return await asyncio.to_thread(self._generate_pdf_sync, note_export)
+
+    def _generate_pdf_sync(self, note_export: NoteExport) -> bytes:
+        """Generate PDF from note data on the calling thread"""
+        if not _REPORTLAB_AVAILABLE:
+            logger.error("ReportLab library not available for PDF generation")
+            raise ImportError("ReportLab is required for PDF generation")
+
+        if settings.PDF_EXPORT_USE_PLATYPUS:
+            return self._render_note_platypus(note_export)
+        return self._render_note_canvas(note_export)
+
+    def _render_note_canvas(self, note_export: NoteExport) -> bytes:
+        """
+        Draw the note straight onto a canvas. A note is a single column of
+        wrapped lines, so this skips Platypus' flowable layout engine.
+        """
+        # ReportLab renders the whole document to bytes when it is finished,
+        # so there is no file buffer to write into
+        pdf = Canvas(None, pagesize=letter)
+        page_width, page_height = letter
+        text_width = page_width - 2 * _PDF_MARGIN
+        y = page_height - _PDF_MARGIN
+
+        def draw(text: str, font, space_after: int = 0) -> None:
+            nonlocal y
+            name, size, leading = font
+            pdf.setFont(name, size)
+            for line in simpleSplit(text, name, size, text_width):
+                if y - leading < _PDF_MARGIN:
+                    pdf.showPage()
+                    pdf.setFont(name, size)
+                    y = page_height - _PDF_MARGIN
+                y -= leading
+                pdf.drawString(_PDF_MARGIN, y, line)
+            y -= space_after
+
+        def draw_lines(text: str) -> None:
+            for line in _non_blank_lines(text):
+                draw(line, _PDF_BODY_FONT)
+
+        # Title and metadata
+        draw(note_export.title, _PDF_TITLE_FONT, space_after=24)
+        draw(
+            f"Created: {note_export.created_at.strftime(_EXPORT_TIMESTAMP_FORMAT)}",
+            _PDF_BODY_FONT,
+        )
+        draw(
+            f"Updated: {note_export.updated_at.strftime(_EXPORT_TIMESTAMP_FORMAT)}",
+            _PDF_BODY_FONT,
+        )
+        if note_export.tags:
+            draw(f"Tags: {note_export.tags}", _PDF_BODY_FONT)
+        y -= 12
+
+        # Add summary if available
+        if note_export.ai_summary:
+            draw("Summary", _PDF_HEADING_FONT, space_after=6)
+            draw(note_export.ai_summary, _PDF_BODY_FONT, space_after=12)
+
+        # Add main content
+        draw("Content", _PDF_HEADING_FONT, space_after=6)
+        draw_lines(note_export.content)
+        y -= 12
+
+        # Add action items if available
+        if note_export.extracted_action_items:
+            draw("Action Items", _PDF_HEADING_FONT, space_after=6)
+            draw_lines(note_export.extracted_action_items)
+
+        return pdf.getpdfdata()
+
+    def _render_note_platypus(self, note_export: NoteExport) -> bytes:
+        """Lay the note out with Platypus flowables"""
+        # Create in-memory PDF
+        buffer = io.BytesIO()
+        
+        # Set up PDF document
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        title_style = _PDF_TITLE_STYLE
+        subtitle_style = _PDF_SUBTITLE_STYLE
+        normal_style = _PDF_NORMAL_STYLE
+        
+        # Build PDF content
+        content = []
+        
+        # Add title
+        content.append(Paragraph(note_export.title.translate(_XML_ESCAPE), title_style))
+        content.append(Spacer(1, 12))
+        
+        # Add metadata
+        metadata = [
+            f"Created: {note_export.created_at.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Updated: {note_export.updated_at.strftime('%Y-%m-%d %H:%M:%S')}"
+        ]
+        
+        if note_export.tags:
+            metadata.append(f"Tags: {note_export.tags.translate(_XML_ESCAPE)}")
+
+        # Lines sharing a style go into one paragraph, parsed and laid out once
+        content.append(Paragraph("<br/>".join(metadata), normal_style))
+        
+        content.append(Spacer(1, 12))
+        
+        # Add summary if available
+        if note_export.ai_summary:
+            content.append(Paragraph("Summary", subtitle_style))
+            content.append(
+                Paragraph(note_export.ai_summary.translate(_XML_ESCAPE), normal_style)
             )
-            
-            normal_style = styles["Normal"]
-            
-            # Build PDF content
-            content = []
-            
-            # Add title
-            content.append(Paragraph(note_export.title, title_style))
             content.append(Spacer(1, 12))
+        
+        # Add main content
+        content.append(Paragraph("Content", subtitle_style))
+        
+        # Split content by paragraphs for better formatting. These stay
+        # separate: one long paragraph is re-split on every page it spans
+        for p in _non_blank_lines(note_export.content.translate(_XML_ESCAPE)):
+            content.append(Paragraph(p, normal_style))
+        
+        content.append(Spacer(1, 12))
+        
+        # Add action items if available
+        if note_export.extracted_action_items:
+            content.append(Paragraph("Action Items", subtitle_style))
             
-            # Add metadata
-            metadata = [
-                f"Created: {note_export.created_at.strftime('%Y-%m-%d %H:%M:%S')}",
-                f"Updated: {note_export.updated_at.strftime('%Y-%m-%d %H:%M:%S')}"
-            ]
-            
-            if note_export.tags:
-                metadata.append(f"Tags: {note_export.tags}")
-                
-            for line in metadata:
-                content.append(Paragraph(line, normal_style))
-            
-            content.append(Spacer(1, 12))
-            
-            # Add summary if available
-            if note_export.ai_summary:
-                content.append(Paragraph("Summary", subtitle_style))
-                content.append(Paragraph(note_export.ai_summary, normal_style))
-                content.append(Spacer(1, 12))
-            
-            # Add main content
-            content.append(Paragraph("Content", subtitle_style))
-            
-            # Split content by paragraphs for better formatting
-            paragraphs = note_export.content.split('\n')
-            for p in paragraphs:
-                if p.strip():  # Skip empty lines
-                    content.append(Paragraph(p, normal_style))
-            
-            content.append(Spacer(1, 12))
-            
-            # Add action items if available
-            if note_export.extracted_action_items:
-                content.append(Paragraph("Action Items", subtitle_style))
-                
-                # Split action items by lines
-                items = note_export.extracted_action_items.split('\n')
-                for item in items:
-                    if item.strip():
-                        content.append(Paragraph(item, normal_style))
-            
-            # Build and return the PDF
-            doc.build(content)
-            pdf_bytes = buffer.getvalue()
-            buffer.close()
-            
-            return pdf_bytes
-            
-        except ImportError:
-            # If ReportLab is not installed
-            logger.error("ReportLab library not available for PDF generation")
-            raise ImportError("ReportLab is required for PDF generation")
+            # Split action items by lines
+            items = _non_blank_lines(
+                note_export.extracted_action_items.translate(_XML_ESCAPE)
+            )
+            content.append(Paragraph("<br/>".join(items), normal_style))
+        
+        # Build and return the PDF
+        doc.build(content)
+        pdf_bytes = buffer.getvalue()
+        buffer.close()
+        
+        return pdf_bytes
@@ -1,16 +1,25 @@
 # app/services/progression_service.py
 import logging
-from typing import List, Tuple, Set
+from typing import Iterable, List, Optional, Tuple, Set
 from datetime import datetime
 
 from sqlalchemy.orm import Session
 from app import models
 from app.models.quest import QuestRarity, QuestType
-from app.services.user_service import UserService
+from app.services.user_service import UserService, calculate_level_for_experience
 from app.services.achievement_service import AchievementService
 
 logger = logging.getLogger(__name__)
 
+# Extra criterion types bumped when a quest of this type or rarity is completed
+_QUEST_TYPE_CRITERIA = {
+    QuestType.BOSS: "boss_quests_completed",
+    QuestType.EPIC: "epic_quests_completed",
+}
+_QUEST_RARITY_CRITERIA = {
+    QuestRarity.LEGENDARY: "legendary_quests_completed",
+}
+
 
 class ProgressionService:
     def __init__(self, db: Session):
@@ -21,7 +30,10 @@ class ProgressionService:
     def handle_quest_completion(
         self, user_id: int, quest: models.Quest
     ) -> Tuple[bool, List[models.Achievement]]:
-        """Handle quest completion progression."""
+        """
+        Handle quest completion progression.
+        All XP, progress and achievement writes are committed together at the end.
+        """
         # Track state for debugging
         user = self.user_service.get_user_by_id(user_id)
         if not user:
@@ -31,19 +43,18 @@ class ProgressionService:
         initial_level = user.level
 
         # Add ONLY the quest XP
-        user.experience += quest.exp_reward
-        self.user_service.update(user)
+        self.user_service.add_experience(user_id, quest.exp_reward)
         logger.info(f"Quest XP added: {quest.exp_reward}")
 
         # Update all relevant achievement progress
-        self._update_quest_achievement_progress(user_id, quest)
+        changed_types = self._update_quest_achievement_progress(user_id, quest)
 
         # Track processed achievements to prevent duplicates
         processed_achievement_ids = set()
 
         # Process all achievements with careful tracking
         leveled_up, newly_unlocked = self._process_achievements_and_levels(
-            user_id, processed_achievement_ids
+            user_id, processed_achievement_ids, changed_types
         )
 
         # Final log for verification
@@ -53,76 +64,99 @@ class ProgressionService:
         )
         logger.info(f"Level change: {initial_level} -> {user.level}")
 
+        self.db.commit()
         return leveled_up, newly_unlocked
 
     def _update_quest_achievement_progress(
         self, user_id: int, quest: models.Quest
-    ) -> None:
-        """Update achievement progress based on quest properties."""
+    ) -> List[str]:
+        """
+        Update achievement progress based on quest properties.
+        Returns the criterion types that were bumped.
+        """
         # Basic quest completion
-        self._update_progress(user_id, "quests_completed", 1)
+        criterion_types = ["quests_completed"]
 
-        # Type-specific
-        if quest.quest_type == QuestType.BOSS:
-            self._update_progress(user_id, "boss_quests_completed", 1)
-        elif quest.quest_type == QuestType.EPIC:
-            self._update_progress(user_id, "epic_quests_completed", 1)
-
-        # Rarity-specific
-        if quest.rarity == QuestRarity.LEGENDARY:
-            self._update_progress(user_id, "legendary_quests_completed", 1)
+        # Type- and rarity-specific
+        if quest.quest_type in _QUEST_TYPE_CRITERIA:
+            criterion_types.append(_QUEST_TYPE_CRITERIA[quest.quest_type])
+        if quest.rarity in _QUEST_RARITY_CRITERIA:
+            criterion_types.append(_QUEST_RARITY_CRITERIA[quest.rarity])
 
         # Time-based
         completion_time = quest.completed_at or datetime.utcnow()
         completion_hour = completion_time.hour
 
         if completion_hour < 8:
-            self._update_progress(user_id, "early_morning_completion", 1)
+            criterion_types.append("early_morning_completion")
         elif completion_hour >= 22:
-            self._update_progress(user_id, "late_night_completion", 1)
+            criterion_types.append("late_night_completion")
 
-    def _update_progress(self, user_id: int, criterion_type: str, amount: int) -> None:
-        """Update achievement progress."""
-        criteria = self.achievement_service.get_criteria_by_type(criterion_type)
+        self._update_progress(user_id, criterion_types, 1)
+        return criterion_types
 
+    def _update_progress(
+        self, user_id: int, criterion_types: Iterable[str], amount: int
+    ) -> None:
+        """Update achievement progress for every criterion of the given types."""
+        criteria = [
+            criterion
+            for criterion_type in criterion_types
+            for criterion in self.achievement_service.get_criteria_by_type(
+                criterion_type
+            )
+        ]
+        if not criteria:
+            return
+
+        # Load the user's progress for every matching criterion in one query
+        progress_map = self.achievement_service.get_user_progress_map(
+            user_id, (criterion.id for criterion in criteria)
+        )
+        user_level = None
+        if any(criterion.criterion_type == "user_level" for criterion in criteria):
+            user_level = self.user_service.get_user_by_id(user_id).level
+
+        levels = {}
+        increments = {}
         for criterion in criteria:
-            progress = self.achievement_service.get_user_progress(user_id, criterion.id)
-
-            # Calculate new value
-            if criterion_type == "user_level":
-                user = self.user_service.get_user_by_id(user_id)
-                new_value = user.level
-            else:
-                current_value = progress.progress if progress else 0
-                new_value = min(current_value + amount, criterion.target_value)
-
-            # Only update if changed
-            if not progress or progress.progress != new_value:
-                self.achievement_service.create_or_update_progress(
-                    user_id, criterion.id, new_value
-                )
+            progress = progress_map.get(criterion.id)
+
+            if criterion.criterion_type == "user_level":
+                # Only update if changed
+                if not progress or progress.progress != user_level:
+                    levels[criterion.id] = user_level
+            elif not progress or progress.progress < criterion.target_value:
+                # Added in the database, so concurrent completions both count
+                increments[criterion.id] = (amount, criterion.target_value)
+
+        # Write the changed records in one statement each
+        self.achievement_service.upsert_progress(user_id, levels)
+        self.achievement_service.increment_progress(user_id, increments)
 
     def _process_achievements_and_levels(
-        self, user_id: int, processed_achievement_ids: Set[int]
+        self,
+        user_id: int,
+        processed_achievement_ids: Set[int],
+        changed_types: Iterable[str],
     ) -> Tuple[bool, List[models.Achievement]]:
         """
         Process achievements and level-ups carefully to prevent duplicates.
         Returns (did_level_up, newly_unlocked_achievements)
         """
-        user = self.user_service.get_user_by_id(user_id)
         newly_unlocked = []
 
         # First check for potential new achievements
-        unlocked = self._check_achievements(user_id, processed_achievement_ids)
+        unlocked = self._check_achievements(
+            user_id, processed_achievement_ids, changed_types
+        )
         if unlocked:
             newly_unlocked.extend(unlocked)
 
             # Award XP for new achievements
             total_achievement_xp = sum(a.exp_reward for a in unlocked)
             if total_achievement_xp > 0:
-                user = self.user_service.get_user_by_id(user_id)  # Refresh user
-                user.experience += total_achievement_xp
-                self.user_service.update(user)
+                self.user_service.add_experience(user_id, total_achievement_xp)
                 logger.info(f"Achievement XP added: {total_achievement_xp}")
 
         # Check for level-ups (just once)
@@ -132,11 +166,11 @@ class ProgressionService:
         if leveled_up:
             # Update level-based progress
             user = self.user_service.get_user_by_id(user_id)  # Refresh user
-            self._update_progress(user_id, "user_level", user.level)
+            self._update_progress(user_id, ["user_level"], user.level)
 
             # Check for level-based achievements
             level_achievements = self._check_achievements(
-                user_id, processed_achievement_ids
+                user_id, processed_achievement_ids, ["user_level"]
             )
             if level_achievements:
                 newly_unlocked.extend(level_achievements)
@@ -144,9 +178,7 @@ class ProgressionService:
                 # Award XP for level-based achievements
                 level_achievement_xp = sum(a.exp_reward for a in level_achievements)
                 if level_achievement_xp > 0:
-                    user = self.user_service.get_user_by_id(user_id)  # Refresh user
-                    user.experience += level_achievement_xp
-                    self.user_service.update(user)
+                    self.user_service.add_experience(user_id, level_achievement_xp)
                     logger.info(f"Level achievement XP added: {level_achievement_xp}")
 
         return leveled_up, newly_unlocked
@@ -159,38 +191,47 @@ class ProgressionService:
 
         original_level = user.level
 
-        # Keep leveling up while user has enough XP
-        while True:
-            xp_needed = self._calculate_xp_for_next_level(user.level)
-            if user.experience >= xp_needed:
-                user.level += 1
-            else:
-                break
-
-        # If level changed, save it
-        if user.level > original_level:
-            self.user_service.update(user)
-            logger.info(f"User leveled up from {original_level} to {user.level}")
+        # Jump straight to the level the current XP reaches
+        new_level = calculate_level_for_experience(user.experience, user.level)
+
+        # If level changed, save it. The conditional update only succeeds for
+        # one of several concurrent completions crossing the same level.
+        if new_level > original_level and self.user_service.raise_level(
+            user_id, new_level
+        ):
+            logger.info(f"User leveled up from {original_level} to {new_level}")
             return True
 
         return False
 
-    def _calculate_xp_for_next_level(self, level: int) -> int:
-        """Calculate XP needed for next level."""
-        return int(100 * (level**1.5))
-
     def _check_achievements(
-        self, user_id: int, processed_achievement_ids: Set[int]
+        self,
+        user_id: int,
+        processed_achievement_ids: Set[int],
+        changed_types: Optional[Iterable[str]] = None,
     ) -> List[models.Achievement]:
         """
         Check for unprocessed achievements that should be unlocked.
         The processed_achievement_ids set prevents double-processing.
+        When changed_types is given, only achievements with a criterion of one
+        of those types are evaluated, since no other achievement can change.
         """
         user = self.user_service.get_user_by_id(user_id)
         if not user:
             return []
 
-        all_achievements = self.achievement_service.get_all()
+        if changed_types is None:
+            all_achievements = self.achievement_service.get_all()
+        else:
+            candidate_ids = (
+                self.achievement_service.get_achievement_ids_for_criterion_types(
+                    changed_types
+                )
+                - processed_achievement_ids
+            )
+            if not candidate_ids:
+                return []
+            all_achievements = self.achievement_service.get_by_ids(candidate_ids)
         user_achievements = self.achievement_service.get_user_achievements(user_id)
         progress_records = self.achievement_service.get_user_all_progress(user_id)
 
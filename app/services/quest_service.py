@@ -1,28 +1,53 @@
 # app/services/quest_service.py
-import asyncio
 import logging
 
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
 from fastapi import File
+from fastapi.concurrency import run_in_threadpool
 
 from app import schemas
 from app.core.config import settings
 from app.core.exceptions import ProcessingException
 from app.models.quest import Quest, QuestRarity, QuestType
 from app.repositories.quest_repository import QuestRepository
-from app.services.user_service import UserService
+from app.services.user_service import UserService, calculate_xp_for_next_level
 from app.services.progression_service import ProgressionService
 from app.services.google_calendar_service import GoogleCalendarService
 from app.integrations.chat_completion import ChatCompletionService
 from app.integrations.speech import DeepgramSTTClient
 from app.integrations.speech.deepgram_stt_client import DeepgramLanguageEnum
 from app.services.subscription_service import SubscriptionService
+from app.utils.concurrency import run_in_background
 
 
 logger = logging.getLogger(__name__)
 
+# Base XP by rarity - minimal multipliers
+_RARITY_MULTIPLIERS = {
+    QuestRarity.COMMON: 1.0,
+    QuestRarity.UNCOMMON: 1.2,
+    QuestRarity.RARE: 1.4,
+    QuestRarity.EPIC: 2,
+    QuestRarity.LEGENDARY: 3.0,
+}
+
+# Base XP by quest type
+_TYPE_BASE_XP = {
+    QuestType.DAILY: settings.BASE_XP_DAILY_QUEST,  # Default: 5
+    QuestType.REGULAR: settings.BASE_XP_REGULAR_QUEST,  # Default: 10
+    QuestType.EPIC: settings.BASE_XP_EPIC_QUEST,  # Default: 25
+    QuestType.BOSS: settings.BASE_XP_BOSS_QUEST,  # Default: 50
+}
+
+# Base XP already scaled by rarity, for every rarity/type pair
+_RARITY_TYPE_XP = {
+    (rarity, quest_type): base_xp * multiplier
+    for rarity, multiplier in _RARITY_MULTIPLIERS.items()
+    for quest_type, base_xp in _TYPE_BASE_XP.items()
+}
+
 
 class QuestService:
     """Service for quest operations."""
@@ -177,7 +202,7 @@ class QuestService:
                 detail="We couldn't turn your voice into a quest",
             )
         
-        asyncio.create_task(self.subscription_service.track_usage(user_id, audio_duration_minutes))
+        run_in_background(self.subscription_service.track_usage(user_id, audio_duration_minutes))
           
            
         exp_reward = self._calculate_quest_exp_reward(
@@ -190,7 +215,10 @@ class QuestService:
 
         if google_calendar:
             try:
-                event_id = self.calendar_service.create_calendar_event(user_id, quest)
+                # The Calendar client blocks on HTTPS, so run it off the event loop
+                event_id = await run_in_threadpool(
+                    self.calendar_service.create_calendar_event, user_id, quest
+                )
                 if event_id:
                     quest.google_calendar_event_id = event_id
                     self.repository.save(quest)
@@ -222,7 +250,7 @@ class QuestService:
             quest_in = await self.chat_completion_service.parse_quest_from_text(
                 transcription_result.text, language, "Argentina"
             )
-            asyncio.create_task(self.subscription_service.track_usage(user_id, audio_duration_minutes))
+            run_in_background(self.subscription_service.track_usage(user_id, audio_duration_minutes))
             
             quest_in.exp_reward = self._calculate_quest_exp_reward(
                 rarity=quest_in.rarity,
@@ -250,23 +278,6 @@ class QuestService:
         # Ensure priority is in the expected 1-100 range
         capped_priority = min(max(priority, 1), 100)
 
-        # Base XP by rarity - minimal multipliers
-        rarity_multipliers = {
-            QuestRarity.COMMON: 1.0,
-            QuestRarity.UNCOMMON: 1.2,
-            QuestRarity.RARE: 1.4,
-            QuestRarity.EPIC: 2,
-            QuestRarity.LEGENDARY: 3.0,
-        }
-
-        # Base XP by quest type
-        type_base_xp = {
-            QuestType.DAILY: settings.BASE_XP_DAILY_QUEST,  # Default: 5
-            QuestType.REGULAR: settings.BASE_XP_REGULAR_QUEST,  # Default: 10
-            QuestType.EPIC: settings.BASE_XP_EPIC_QUEST,  # Default: 25
-            QuestType.BOSS: settings.BASE_XP_BOSS_QUEST,  # Default: 50
-        }
-
         # Priority multiplier - very modest
         priority_multiplier = 0.9 + (capped_priority * 0.1)  # 1.0 - 1.4
 
@@ -274,16 +285,14 @@ class QuestService:
         level_factor = 1.0 + (min(user_level, 30) - 1) * 0.7  # Max 1.58 at level 30
 
         # Calculate base XP
-        base_xp = type_base_xp[quest_type]
+        base_xp = _TYPE_BASE_XP[quest_type]
         calculated_xp = int(
-            base_xp * rarity_multipliers[rarity] * priority_multiplier * level_factor
+            _RARITY_TYPE_XP[(rarity, quest_type)] * priority_multiplier * level_factor
         )
 
         # Hard cap based on level - MUCH more conservative
         # Only 5% of level XP for most quests, max 10% for truly exceptional quests
-        xp_for_next_level = self.progression_service._calculate_xp_for_next_level(
-            user_level
-        )
+        xp_for_next_level = calculate_xp_for_next_level(user_level)
         standard_cap = int(xp_for_next_level * 0.05)  # 5% of level XP
 
         # Exceptional quest cap (legendary + boss + max priority)
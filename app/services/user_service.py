@@ -1,5 +1,5 @@
 # app/services/user_service.py
-from typing import Optional, Tuple
+from typing import Optional
 from sqlalchemy.orm import Session
 import logging
 
@@ -9,6 +9,34 @@ from app.core.exceptions import DuplicateResourceException, ResourceNotFoundExce
 
 logger = logging.getLogger(__name__)
 
+# XP thresholds for the realistic level range, precomputed so level checks
+# are a tuple index instead of a float pow per call
+_XP_TABLE = tuple(int(100 * (level**1.5)) for level in range(1000))
+
+
+def calculate_xp_for_next_level(level: int) -> int:
+    """
+    Calculate XP required for the next level using RPG-style formula.
+    Uses a common formula: 100 * (level^1.5)
+    """
+    if 0 <= level < len(_XP_TABLE):
+        return _XP_TABLE[level]
+    return int(100 * (level**1.5))
+
+
+def calculate_level_for_experience(experience: int, level: int = 1) -> int:
+    """
+    Return the level reached with the given XP, never below the current level.
+    Inverts 100 * (level^1.5) instead of stepping through each level.
+    """
+    new_level = int((max(experience, 0) / 100) ** (2 / 3))
+    # Correct for float rounding around the int-floored thresholds
+    while calculate_xp_for_next_level(new_level) <= experience:
+        new_level += 1
+    while new_level > 0 and calculate_xp_for_next_level(new_level - 1) > experience:
+        new_level -= 1
+    return max(level, new_level)
+
 
 class UserService:
     def __init__(self, db: Session):
@@ -23,64 +51,21 @@ class UserService:
         """Get user by ID."""
         return self.repository.get_by_id(user_id)
 
-    def add_experience(self, user_id: int, exp_amount: int) -> Optional[models.User]:
-        """Add experience to a user."""
+    def add_experience(self, user_id: int, exp_amount: int) -> Optional[int]:
+        """Add experience to a user and return the new total."""
         if exp_amount <= 0:
             logger.warning(
                 f"Attempted to add non-positive XP amount: {exp_amount} to user {user_id}"
             )
-            return self.get_user_by_id(user_id)
-
-        logger.info(f"Adding {exp_amount} experience to user {user_id}")
-        user = self.repository.get_by_id(user_id)
-        if not user:
             return None
 
-        # Log before state
-        logger.info(f"User {user_id} before XP: {user.experience}")
-
-        # Add experience
-        user.experience += exp_amount
+        new_experience = self.repository.add_experience(user_id, exp_amount)
+        logger.info(f"User {user_id} after XP: {new_experience} (+{exp_amount})")
+        return new_experience
 
-        # Log after state
-        logger.info(f"User {user_id} after XP: {user.experience} (+{exp_amount})")
-
-        return self.repository.update(user)
-
-    def calculate_xp_for_next_level(self, level: int) -> int:
-        """
-        Calculate XP required for the next level using RPG-style formula.
-        Uses a common formula: 100 * (level^1.5)
-        """
-        return int(100 * (level**1.5))
-
-    def check_and_apply_level_up(self, user_id: int) -> Tuple[bool, int]:
-        """
-        Check if user has enough XP to level up and apply levels if eligible.
-        Returns (did_level_up, new_level)
-        """
-        user = self.repository.get_by_id(user_id)
-        if not user:
-            logger.error(f"User {user_id} not found during level check")
-            return False, 0
-
-        original_level = user.level
-
-        # Check for multiple level-ups
-        while True:
-            xp_needed = self.calculate_xp_for_next_level(user.level)
-            if user.experience >= xp_needed:
-                user.level += 1
-                logger.info(f"User {user_id} leveled up to {user.level}")
-            else:
-                break
-
-        if user.level > original_level:
-            # Update user if they leveled up
-            self.repository.update(user)
-            return True, user.level
-
-        return False, original_level
+    def raise_level(self, user_id: int, level: int) -> bool:
+        """Raise a user's level unless a concurrent request already did."""
+        return self.repository.raise_level(user_id, level)
 
     def update(self, user: models.User):
         return self.repository.update(user)
@@ -1,10 +1,14 @@
+import io
 import os
 import tempfile
 import logging
-from typing import Dict, Any
+from uuid import uuid4
+from typing import Dict, Any, List, Optional
 from fastapi import UploadFile
 from pydub import AudioSegment
 
+from app.core.config import settings
+
 # Set up module logger
 logger = logging.getLogger(__name__)
 
@@ -68,3 +72,79 @@ async def get_audio_info(audio_file: UploadFile) -> Dict[str, Any]:
                 logger.warning(
                     f"Failed to delete temporary audio file {temp_file_path}: {str(e)}"
                 )
+
+
+def split_audio_on_silence(
+    audio: bytes,
+    filename: Optional[str] = None,
+    min_chunk_seconds: int = 20,
+    max_chunk_seconds: int = 60,
+    step_ms: int = 250,
+) -> List[bytes]:
+    """
+    Split audio into chunks for parallel transcription, cutting in silence.
+
+    Each cut is made in the quietest step between min_chunk_seconds and
+    max_chunk_seconds into the remaining audio, so words are not split across
+    chunks. CPU-bound; run it in a thread from async code.
+
+    Args:
+        audio: The encoded audio file
+        filename: Original filename, used to hint the format
+        min_chunk_seconds: Shortest chunk, except for the last one
+        max_chunk_seconds: Longest chunk
+        step_ms: Resolution of the silence search
+
+    Returns:
+        The chunks as 16 kHz mono WAV files, in order
+    """
+    suffix = os.path.splitext(filename)[1].lstrip(".") if filename else None
+    segment = AudioSegment.from_file(io.BytesIO(audio), format=suffix or None)
+    # Speech recognition doesn't need more, and it keeps the WAV chunks small
+    segment = segment.set_channels(1).set_frame_rate(16000)
+
+    min_ms = min_chunk_seconds * 1000
+    max_ms = max_chunk_seconds * 1000
+    chunks = []
+    start = 0
+    while len(segment) - start > max_ms:
+        window = segment[start + min_ms : start + max_ms]
+        quietest = min(
+            range(0, len(window) - step_ms + 1, step_ms),
+            key=lambda offset: window[offset : offset + step_ms].rms,
+        )
+        # Cut in the middle of the quiet step
+        cut = start + min_ms + quietest + step_ms // 2
+        chunks.append(segment[start:cut])
+        start = cut
+    chunks.append(segment[start:])
+
+    logger.debug(
+        f"Split {segment.duration_seconds:.2f}s of audio into {len(chunks)} chunks"
+    )
+    return [chunk.export(io.BytesIO(), format="wav").getvalue() for chunk in chunks]
+
+
+def save_voice_note_audio(audio: bytes, filename: Optional[str]) -> str:
+    """
+    Store a voice note's audio outside the request so background processing
+    can read it after the upload is closed. Returns the file path.
+    """
+    suffix = os.path.splitext(filename)[1] if filename else ""
+    os.makedirs(settings.VOICE_NOTE_AUDIO_DIR, exist_ok=True)
+    path = os.path.join(settings.VOICE_NOTE_AUDIO_DIR, f"{uuid4().hex}{suffix}")
+    with open(path, "wb") as f:
+        f.write(audio)
+    return path
+
+
+def delete_voice_note_audio(path: Optional[str]) -> None:
+    """Remove a stored voice note audio file, if it is still there."""
+    if not path:
+        return
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to delete voice note audio {path}: {str(e)}")
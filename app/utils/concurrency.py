@@ -0,0 +1,42 @@
+import asyncio
+import weakref
+from typing import Coroutine, Set
+
+# The event loop only keeps weak references to tasks, so fire-and-forget
+# tasks are held here until they finish
+_BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+
+def run_in_background(coro: Coroutine) -> asyncio.Task:
+    """Schedule a coroutine without awaiting it, keeping it alive until done."""
+    task = asyncio.create_task(coro)
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return task
+
+
+class LoopSemaphore:
+    """
+    A process-wide asyncio.Semaphore.
+
+    A semaphore is bound to the event loop it first waits on, so this keeps
+    one per running loop (the app has one; tests may start several).
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        # Event loop -> its semaphore, dropped when the loop is
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._value)
+        return semaphore
+
+    async def __aenter__(self) -> None:
+        await self._semaphore().acquire()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._semaphore().release()
@@ -0,0 +1,24 @@
+# scripts/freeze_openapi.py
+"""
+Generate the OpenAPI schema once at build time.
+
+The app serves app/static/openapi.json when it exists instead of building the
+schema from every pydantic model on the first /openapi.json request.
+"""
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import orjson
+from fastapi import FastAPI
+
+from app.main import app, FROZEN_OPENAPI_PATH
+
+
+if __name__ == "__main__":
+    FROZEN_OPENAPI_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Call FastAPI's generator directly so an existing frozen file is ignored
+    FROZEN_OPENAPI_PATH.write_bytes(orjson.dumps(FastAPI.openapi(app)))
+    print(f"OpenAPI schema written to {FROZEN_OPENAPI_PATH}")
@@ -0,0 +1,119 @@
+import asyncio
+import orjson
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from app.core.config import settings
+from app.integrations.chat_completion import llm
+from app.integrations.chat_completion.llm import (
+    ChatCompletionService,
+    _checkpoint_key,
+    _load_checkpoint,
+)
+
+
+def _quest_json(title):
+    return orjson.dumps({"title": title}).decode()
+
+
+class TestChatCompletionService:
+    """
+    Test cases for request sharing and batch parsing, with the upstream
+    completion mocked out
+    """
+
+    @pytest.fixture(autouse=True)
+    def llm_settings(self):
+        """Enable LLM features and start from empty process-wide state"""
+        llm._response_cache.clear()
+        llm._inflight.clear()
+        with patch.object(settings, "ENABLE_LLM_FEATURES", True), \
+                patch.object(settings, "LLM_RESPONSE_CACHE_ENABLED", True):
+            yield
+        llm._response_cache.clear()
+        llm._inflight.clear()
+
+    @pytest.fixture
+    def service(self):
+        return ChatCompletionService()
+
+    @pytest.mark.asyncio
+    async def test_repeated_request_uses_cached_response(self, service):
+        """An identical request is answered from the cache, a different one is not"""
+        completion = AsyncMock(return_value="Hola")
+        with patch.object(ChatCompletionService, "_create_completion", completion):
+            assert await service.call_llm_api("Hello", model="m") == "Hola"
+            assert await service.call_llm_api("Hello", model="m") == "Hola"
+            assert completion.await_count == 1
+
+            await service.call_llm_api("Goodbye", model="m")
+            assert completion.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(self, service):
+        """Requests arriving while an identical one is in flight join it"""
+        release = asyncio.Event()
+
+        async def slow_completion(*args, **kwargs):
+            await release.wait()
+            return "Hola"
+
+        completion = AsyncMock(side_effect=slow_completion)
+        with patch.object(ChatCompletionService, "_create_completion", completion):
+            callers = [
+                asyncio.ensure_future(service.call_llm_api("Hello", model="m"))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*callers)
+
+        assert results == ["Hola"] * 3
+        assert completion.await_count == 1
+        assert not llm._inflight
+
+    @pytest.mark.asyncio
+    async def test_batch_parse_resumes_from_checkpoint(self, service, tmp_path):
+        """Items in the checkpoint are rebuilt from it and a partial line is skipped"""
+        checkpoint = tmp_path / "parse.jsonl"
+        done = ("Buy milk", "en", "Argentina")
+        pending = ("Call mom", "en", "Argentina")
+        checkpoint.write_bytes(
+            orjson.dumps({"key": _checkpoint_key(done), "result": {"title": "Milk"}})
+            + b"\n"
+            + b'{"key": "abc", "res'
+        )
+
+        completion = AsyncMock(return_value=_quest_json("Mom"))
+        with patch.object(ChatCompletionService, "_create_completion", completion):
+            results = await service.parse_quests_from_text(
+                [done, pending], checkpoint_path=str(checkpoint)
+            )
+
+        assert [quest.title for quest in results] == ["Milk", "Mom"]
+        assert completion.await_count == 1
+        completed = _load_checkpoint(str(checkpoint))
+        assert set(completed) == {_checkpoint_key(done), _checkpoint_key(pending)}
+        assert completed[_checkpoint_key(pending)]["title"] == "Mom"
+
+    @pytest.mark.asyncio
+    async def test_batch_parse_does_not_record_failures(self, service, tmp_path):
+        """A failed item is returned as its exception and retried on the next run"""
+        checkpoint = tmp_path / "parse.jsonl"
+        item = ("Buy milk", "en", "Argentina")
+
+        completion = AsyncMock(return_value=None)
+        with patch.object(ChatCompletionService, "_create_completion", completion):
+            results = await service.parse_quests_from_text(
+                [item], checkpoint_path=str(checkpoint)
+            )
+        assert isinstance(results[0], ValueError)
+        assert _load_checkpoint(str(checkpoint)) == {}
+
+        completion = AsyncMock(return_value=_quest_json("Milk"))
+        with patch.object(ChatCompletionService, "_create_completion", completion):
+            results = await service.parse_quests_from_text(
+                [item], checkpoint_path=str(checkpoint)
+            )
+        assert results[0].title == "Milk"
+        assert completion.await_count == 1
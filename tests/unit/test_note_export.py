@@ -0,0 +1,36 @@
+import pytest
+from urllib.parse import unquote
+
+from app.api.routes.notes import _content_disposition
+from app.models import Note
+from app.models.note import NoteExportFormat
+from app.services.note_service import NoteService
+
+
+class TestNoteExport:
+    """
+    Test cases for note export filenames
+    """
+
+    @pytest.mark.asyncio
+    async def test_non_latin_title_gives_encodable_header(self, db, create_test_user):
+        """A title outside Latin-1 still produces a valid Content-Disposition"""
+        note = Note(owner_id=create_test_user.id, title="會議 notes 😀", content="Agenda")
+        db.add(note)
+        db.commit()
+
+        _, _, filename = await NoteService(db).export_note(
+            create_test_user.id, note.id, NoteExportFormat.TEXT
+        )
+        assert filename == "會議_notes_😀.txt"
+
+        header = _content_disposition(filename)
+        header.encode("latin-1")
+        assert 'filename="___notes__.txt"' in header
+        assert unquote(header.split("filename*=UTF-8''")[1]) == filename
+
+    def test_header_keeps_ascii_names(self):
+        """Plain names are sent unchanged in both parameters"""
+        assert _content_disposition("Weekly_plan.md") == (
+            "attachment; filename=\"Weekly_plan.md\"; filename*=UTF-8''Weekly_plan.md"
+        )
@@ -0,0 +1,75 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.core import security
+from app.core.security import create_oauth_state, verify_oauth_state, _sign_oauth_state
+from app.services.google_calendar_service import GoogleCalendarService
+
+
+def _signed(payload):
+    """A state token for an arbitrary payload, with a valid signature"""
+    return f"{payload}.{_sign_oauth_state(payload)}"
+
+
+class TestOAuthState:
+    """
+    Test cases for signed OAuth state tokens
+    """
+
+    def test_valid_state_returns_user_id(self):
+        assert verify_oauth_state(create_oauth_state(42)) == 42
+
+    def test_tampered_signature_is_rejected(self):
+        state = create_oauth_state(42)
+        flipped = "0" if state[-1] != "0" else "1"
+        assert verify_oauth_state(state[:-1] + flipped) is None
+
+    def test_tampered_user_id_is_rejected(self):
+        nonce, _, expires, signature = create_oauth_state(42).split(".")
+        assert verify_oauth_state(f"{nonce}.43.{expires}.{signature}") is None
+
+    def test_expired_state_is_rejected(self):
+        state = create_oauth_state(42)
+        with patch.object(
+            security.time,
+            "time",
+            return_value=security.time.time() + security.OAUTH_STATE_TTL_SECONDS + 1,
+        ):
+            assert verify_oauth_state(state) is None
+
+    @pytest.mark.parametrize(
+        "state",
+        [
+            "",
+            "nonce.42",
+            "a.b.c.d.e",
+            _signed("nonce.42.9999999999.extra"),
+            _signed("nonce.forty-two.9999999999"),
+            _signed("nonce.42.tomorrow"),
+            "nonce.42.9999999999.é",
+        ],
+    )
+    def test_malformed_state_is_rejected(self, state):
+        assert verify_oauth_state(state) is None
+
+    def test_used_state_cannot_be_replayed(self, db, create_test_user):
+        """Only the latest state completes the flow, and only once"""
+        service = GoogleCalendarService(db)
+        with patch("app.services.google_calendar_service.GoogleOAuthClient") as client:
+            flow = MagicMock()
+            flow.authorization_url.side_effect = lambda **kwargs: (kwargs["state"], None)
+            client.create_oauth_flow.return_value = flow
+            client.exchange_code.return_value = MagicMock(
+                token="access", refresh_token="refresh", expiry=None
+            )
+            client.parse_expiry.return_value = None
+
+            old_state = service.start_oauth_flow(create_test_user.id)["authorization_url"]
+            state = service.start_oauth_flow(create_test_user.id)["authorization_url"]
+
+            with pytest.raises(ValueError):
+                service.complete_oauth_flow(old_state, "code")
+            integration = service.complete_oauth_flow(state, "code")
+            assert integration.connection_status == "connected"
+            with pytest.raises(ValueError):
+                service.complete_oauth_flow(state, "code")
@@ -0,0 +1,141 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+
+from app import models
+from app.models.quest import QuestRarity, QuestType
+from app.repositories.achievement_repository import AchievementRepository
+from app.services.achievement_service import invalidate_criteria_cache
+from app.services.progression_service import ProgressionService
+
+
+class TestQuestCompletionProgression:
+    """
+    Test cases for achievement progression on quest completion
+    """
+
+    @pytest.fixture(autouse=True)
+    def reset_criteria_cache(self):
+        invalidate_criteria_cache()
+        yield
+        invalidate_criteria_cache()
+
+    def _seed_achievements(self, db, count):
+        """Create `count` quest achievements, each with two criteria"""
+        for i in range(count):
+            achievement = models.Achievement(
+                name=f"Achievement {i}", description="test", exp_reward=0
+            )
+            db.add(achievement)
+            db.flush()
+            db.add_all(
+                [
+                    models.AchievementCriterion(
+                        achievement_id=achievement.id,
+                        criterion_type="quests_completed",
+                        target_value=i + 1,
+                    ),
+                    models.AchievementCriterion(
+                        achievement_id=achievement.id,
+                        criterion_type="boss_quests_completed",
+                        target_value=i + 1,
+                    ),
+                ]
+            )
+        db.commit()
+
+    def _complete_quest(self, db, user):
+        quest = models.Quest(
+            title="Boss fight",
+            owner_id=user.id,
+            quest_type=QuestType.BOSS,
+            rarity=QuestRarity.COMMON,
+            exp_reward=10,
+            is_completed=True,
+            completed_at=datetime(2024, 1, 1, 12),
+        )
+
+        statements = []
+        lazy_loads = []
+
+        def count_statement(*args, **kwargs):
+            statements.append(args[2])
+
+        def track_lazy_load(orm_execute_state):
+            if (
+                orm_execute_state.is_select
+                and orm_execute_state.lazy_loaded_from is not None
+            ):
+                lazy_loads.append(orm_execute_state.statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        event.listen(db, "do_orm_execute", track_lazy_load)
+        try:
+            ProgressionService(db).handle_quest_completion(user.id, quest)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+            event.remove(db, "do_orm_execute", track_lazy_load)
+        return statements, lazy_loads
+
+    def test_quest_completion_unlocks_achievement(self, db, create_test_user):
+        self._seed_achievements(db, 2)
+
+        self._complete_quest(db, create_test_user)
+
+        unlocked = db.query(models.UserAchievement).all()
+        assert [ua.achievement.name for ua in unlocked] == ["Achievement 0"]
+        progress = {
+            p.criterion.criterion_type: p.progress
+            for p in db.query(models.UserAchievementProgress).all()
+            if p.criterion.target_value == 2
+        }
+        assert progress == {"quests_completed": 1, "boss_quests_completed": 1}
+
+    def test_query_count_does_not_grow_with_achievements(self, db, create_test_user):
+        self._seed_achievements(db, 2)
+        few, lazy_loads = self._complete_quest(db, create_test_user)
+        assert lazy_loads == []
+
+        self._seed_achievements(db, 20)
+        # Criteria are cached, so reload them to see the new achievements
+        invalidate_criteria_cache()
+        many, lazy_loads = self._complete_quest(db, create_test_user)
+        assert lazy_loads == []
+
+        # The new achievements were evaluated: the first of them unlocked
+        # alongside the original second one
+        unlocked = db.query(models.UserAchievement).all()
+        assert sorted(ua.achievement_id for ua in unlocked) == [1, 2, 3]
+        assert len(many) <= len(few) + 1
+
+    def test_increment_progress_adds_in_database(self, db, create_test_user):
+        self._seed_achievements(db, 3)
+        targets = {
+            criterion.id: criterion.target_value
+            for criterion in db.query(models.AchievementCriterion).filter_by(
+                criterion_type="quests_completed"
+            )
+        }
+        repository = AchievementRepository(db)
+
+        def increment(amount):
+            repository.increment_progress(
+                create_test_user.id,
+                {
+                    criterion_id: (amount, target_value)
+                    for criterion_id, target_value in targets.items()
+                },
+            )
+            return {
+                criterion_id: repository.get_user_progress(
+                    create_test_user.id, criterion_id
+                ).progress
+                for criterion_id in targets
+            }
+
+        # Two writers that both read no progress must not overwrite each
+        # other, and each record is capped at its own criterion's target
+        increment(1)
+        assert sorted(increment(1).values()) == [1, 2, 2]
+        assert sorted(increment(5).values()) == [1, 2, 3]
@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.models import Note, Subscription
+from app.repositories.note_repository import NoteRepository
+from app.schemas.note import NoteProcessingStatus
+from app.services.note_service import NoteService
+
+
+class TestVoiceNoteRecovery:
+    """
+    Test cases for failing voice notes whose processing was lost
+    """
+
+    @pytest.fixture
+    def stale_note(self, db, create_test_user):
+        """A voice note stuck in processing for a day, with 3 tracked minutes"""
+        db.add(Subscription(user_id=create_test_user.id, total_minutes_used_this_month=10.0))
+        note = Note(
+            owner_id=create_test_user.id,
+            title="Note is being processed",
+            processing_status=NoteProcessingStatus.PROCESSING,
+            minutes_tracked=3.0,
+        )
+        db.add(note)
+        db.commit()
+        note.updated_at = datetime.utcnow() - timedelta(days=1)
+        db.commit()
+        return note.id
+
+    def _minutes_used(self, db):
+        db.expire_all()
+        return db.query(Subscription).one().total_minutes_used_this_month
+
+    def test_mark_processing_failed_claims_once(self, db, stale_note):
+        """Only the first caller moves the note out of processing"""
+        repository = NoteRepository(db)
+
+        note = repository.mark_processing_failed(stale_note, "Processing was interrupted")
+        assert note.processing_status == NoteProcessingStatus.ERROR
+        assert note.processing_error == "Processing was interrupted"
+        db.commit()
+
+        assert repository.mark_processing_failed(stale_note, "again") is None
+
+    @pytest.mark.asyncio
+    async def test_sweep_refunds_each_note_once(self, db, stale_note):
+        """Repeated sweeps and a late failure do not refund the note again"""
+        service = NoteService(db)
+
+        assert await service.fail_stale_voice_notes() == 1
+        assert await service.fail_stale_voice_notes() == 0
+        assert await service._fail_processing(stale_note, "late failure") is False
+
+        assert self._minutes_used(db) == 7.0
+        note = db.query(Note).one()
+        assert note.processing_status == NoteProcessingStatus.ERROR
+        assert note.minutes_refunded is True
+
+    @pytest.mark.asyncio
+    async def test_failed_refund_rolls_back_status(self, db, stale_note):
+        """A note whose refund fails stays processing for the next sweep"""
+        service = NoteService(db)
+
+        with patch.object(
+            service.subscription_repository, "refund_usage", side_effect=RuntimeError("db down")
+        ):
+            assert await service.fail_stale_voice_notes() == 0
+
+        db.expire_all()
+        note = db.query(Note).one()
+        assert note.processing_status == NoteProcessingStatus.PROCESSING
+        assert not note.minutes_refunded
+        assert self._minutes_used(db) == 10.0
+
+        assert await service.fail_stale_voice_notes() == 1
+        assert self._minutes_used(db) == 7.0